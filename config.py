@@ -15,6 +15,7 @@ class Config:
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
     CACHE_DIR = DATA_DIR / "cache"
     HF_CACHE_DIR = DATA_DIR / "hf_cache"
+    MARKET_DATA_DIR = DATA_DIR / "market_data"  # Parquet OHLCV store, one partition per symbol
     MODELS_DIR = BASE_DIR / "models" / "saved_models"
     LOGS_DIR = BASE_DIR / "logs"
     
@@ -23,8 +24,45 @@ class Config:
     FINNHUB_API_KEY = os.getenv('FINNHUB_API_KEY')
     HF_TOKEN = os.getenv('HF_TOKEN')
     
+    # News collection (async, see async_news.py); base URLs can point at a stub server
+    NEWS_PROVIDERS = {
+        'newsapi': {'base_url': os.getenv('NEWSAPI_BASE_URL', 'https://newsapi.org/v2'),
+                    'rate_per_sec': 1.0, 'burst': 5, 'concurrency': 4},
+        'finnhub': {'base_url': os.getenv('FINNHUB_BASE_URL', 'https://finnhub.io/api/v1'),
+                    'rate_per_sec': 0.9, 'burst': 6, 'concurrency': 8},  # Free tier: 60/min; burst + 60 * rate <= 60
+    }
+    NEWS_KEYWORDS_PER_SYMBOL = 2
+    NEWS_MAX_RETRIES = 4
+    NEWS_BACKOFF_SECONDS = 0.5  # Doubled per retry (with jitter) unless Retry-After is sent
+    NEWS_MAX_RETRY_AFTER = 60  # Longer Retry-After waits are cut to this many seconds
+    NEWS_REQUEST_TIMEOUT = 15
+    
     # Stock Configuration
     STOCK_SYMBOLS = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA']
+    COMPANY_MAPPINGS = {  # NewsAPI search keywords per symbol
+        'AAPL': ['Apple', 'iPhone', 'Tim Cook'],
+        'GOOGL': ['Google', 'Alphabet', 'Sundar Pichai'],
+        'MSFT': ['Microsoft', 'Azure', 'Satya Nadella'],
+        'AMZN': ['Amazon', 'AWS', 'Andy Jassy'],
+        'TSLA': ['Tesla', 'Elon Musk'],
+        'META': ['Meta Platforms', 'Facebook', 'Mark Zuckerberg'],
+        'NVDA': ['Nvidia', 'Jensen Huang'],
+    }
+    STOCK_FETCH_MODE = 'threads'  # 'sequential', 'threads' (Ticker.history pool) or 'download' (yf.download)
+    STOCK_FETCH_WORKERS = 8  # Concurrent requests
+    STOCK_FETCH_CHUNK_SIZE = 50  # Symbols per chunk / bulk download
+    STOCK_STORE = True  # Serve bars from MARKET_DATA_DIR, fetching only new ones
+    
+    # Technical indicators (computed for all symbols at once, see indicators.py)
+    RSI_PERIOD = 14
+    VOLUME_MA_WINDOW = 5
+    MACD_SPANS = (12, 26, 9)  # Fast, slow and signal EMA spans
+    BOLLINGER_WINDOW = 20
+    BOLLINGER_STD = 2
+    ATR_PERIOD = 14  # Wilder smoothing of the true range
+    STREAM_EMA_SPAN = 12  # Streaming (intraday) indicator state, see streaming_indicators.py
+    STREAM_RSI_SMOOTHING = 'sma'  # 'sma' (same as the batch rsi column) or 'wilder'
+    STREAM_STATE_PATH = CACHE_DIR / "indicator_state.json"
     
     # Hugging Face Configuration
     USE_HF_DATASET = True
@@ -33,14 +71,62 @@ class Config:
     
     USE_HF_SENTIMENT = False  # Start with VADER for speed
     HF_SENTIMENT_MODEL = "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
+    HF_BACKEND = 'pytorch'  # 'pytorch' or 'onnx' (ONNX Runtime, CPU)
+    HF_ONNX_QUANTIZE = True  # Dynamic int8 weights for the ONNX backend
+    HF_MAX_SEQ_LEN = 128  # Tokens per text; headlines rarely need more
+    HF_NUM_WORKERS = 1  # >1 shards inference across pinned worker processes
+    HF_USE_SNAPSHOT = True  # Load from a materialized local snapshot when present (python -m src.sentiment.snapshot)
+    HF_TOKEN_CACHE = True  # Pre-tokenize the HF dataset once (Arrow, under HF_CACHE_DIR)
+    HF_SLIDING_WINDOW = False  # analyze_dataframe: score long texts over overlapping windows
+    HF_WINDOW_OVERLAP = 32  # Tokens shared by consecutive windows
+    HF_MAX_WINDOWS = 8  # Per text; longer texts keep evenly spaced windows
+    HF_WINDOW_POOLING = 'attention'  # 'mean', 'max' or 'attention' (confidence-weighted)
+    ARTICLE_TEXT_COLUMNS = ['title', 'description', 'content']  # Joined by article_text() into NewsCollector's SENTIMENT_TEXT_COLUMN
+    # Named checkpoints served side by side (API 'model' parameter); values are an
+    # HF model id or a dict of HuggingFaceSentimentAnalyzer kwargs
+    SENTIMENT_MODELS = {
+        'financial-news': HF_SENTIMENT_MODEL,
+        'financial-news-onnx': {'model_name': HF_SENTIMENT_MODEL, 'backend': 'onnx'},
+    }
+    SENTIMENT_MODEL_MEMORY_MB = 2048  # Weight memory budget; least recently used models are evicted past it
     
+    # 'vader', 'huggingface', 'cascade' (VADER, then HF for ambiguous texts)
+    # 'student' (hashed n-gram model distilled from HF, see run_distill.py)
+    # or 'gold' (dataset labels as-is, for training runs)
     SENTIMENT_MODE = 'huggingface' if USE_HF_SENTIMENT else 'vader'
+    CASCADE_AMBIGUITY_BAND = 0.5  # |VADER compound| below this goes to HF
+    SENTIMENT_WARMUP = True  # Run a dummy batch when the API starts
+    SENTIMENT_TEXT_COLUMN = 'news_text'  # Default analyze_dataframe column for every analyzer
+    SENTIMENT_STUDENT_PATH = MODELS_DIR / "sentiment_student.pkl"
+    STUDENT_HASH_FEATURES = 2 ** 20
+    STUDENT_NGRAM_RANGE = (1, 2)
+    GOLD_LABEL_COLUMN = 'news_sentiment'  # Set by create_stock_news_dataset
+    GOLD_FALLBACK_MODE = 'vader'  # Scores rows with no gold label
+    PIPELINE_SENTIMENT_MODE = None  # run_pipeline.py override, e.g. 'gold'; None = SENTIMENT_MODE
     
     # Model Settings
-    USE_CACHE = True
+    USE_CACHE = True  # SQLite cache of Hugging Face results (VADER/student are cheaper than a lookup)
+    SENTIMENT_CACHE_PATH = CACHE_DIR / "sentiment_cache.sqlite"
+    SENTIMENT_CACHE_MAX_ENTRIES = 1_000_000
     DEFAULT_DAYS_BACK = 30
     MAX_SAMPLES = 500
     BATCH_SIZE = 16
+    HF_BATCHING = 'length'  # 'fixed' (input order) or 'length' (token-budget buckets)
+    HF_MAX_BATCH_TOKENS = 4096  # Padded tokens per batch in 'length' mode
+    HF_AUTOTUNE = True  # Apply batch size / torch threads tuned offline (python -m src.sentiment.autotune)
+    HF_AUTOTUNE_BATCH_SIZES = [4, 8, 16, 32, 64]
+    HF_AUTOTUNE_LATENCY_MS = 250  # p95 latency budget per batch
+    
+    # Sentiment Workers (VADER batch scoring)
+    SENTIMENT_WORKERS = os.cpu_count() or 1
+    SENTIMENT_PARALLEL_MIN_ROWS = 20000  # Below this, score in-process
+    STREAM_CHUNK_SIZE = 10000  # Rows per chunk for streaming sentiment
+    
+    # Text normalization / dedup before sentiment inference
+    SENTIMENT_DEDUPE = True
+    TEXT_NORMALIZE_LOWERCASE = False  # VADER reads ALL-CAPS as emphasis
+    TEXT_STRIP_URLS = True
+    TEXT_MASK_CASHTAGS = True  # $AAPL -> $TICKER
     
     # API Settings
     API_HOST = '0.0.0.0'
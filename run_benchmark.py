@@ -0,0 +1,49 @@
+"""
+Run the offline sentiment engine benchmark
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.sentiment.benchmark import run_benchmark, TEXT_LENGTHS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VADER and Hugging Face sentiment engines")
+    parser.add_argument('--engines', nargs='+', default=['vader', 'huggingface'],
+                        choices=['vader', 'huggingface'])
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[8, 32])
+    parser.add_argument('--lengths', nargs='+', default=['short', 'long'], choices=list(TEXT_LENGTHS))
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 0],
+                        help="torch threads per case; 0 means all cores")
+    parser.add_argument('--cache', nargs='+', default=['off', 'warm'], choices=['off', 'warm'])
+    parser.add_argument('--texts', type=int, default=512, help="texts per case")
+    parser.add_argument('--output', type=Path, default=None, help="JSON report path")
+    args = parser.parse_args()
+    
+    print("="*70)
+    print("📊 SENTIMENT ENGINE BENCHMARK")
+    print("="*70)
+    
+    report = run_benchmark(
+        engines=args.engines,
+        batch_sizes=args.batch_sizes,
+        lengths=args.lengths,
+        threads=[t or None for t in args.threads],
+        cache_modes=args.cache,
+        texts=args.texts,
+        output_path=args.output
+    )
+    
+    print(f"\n✅ {len(report['runs'])} cases complete")
+
+if __name__ == "__main__":
+    main()
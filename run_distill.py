@@ -0,0 +1,51 @@
+"""
+Train the distilled student sentiment model
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from config import config
+from src.data_collection.hf_data_loader import HuggingFaceDataLoader
+from src.sentiment.student_analyzer import train_student, teacher_labels
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the Hugging Face sentiment model into a hashed n-gram student")
+    parser.add_argument('--labels', default='teacher', choices=['teacher', 'gold'],
+                        help="train on Hugging Face predictions or the dataset's 'sentiment' column")
+    parser.add_argument('--max-samples', type=int, default=None,
+                        help="corpus size cap (loader keeps 2x this); default from config")
+    parser.add_argument('--output', type=Path, default=None, help="student model path")
+    args = parser.parse_args()
+    
+    if args.max_samples:
+        config.MAX_SAMPLES = args.max_samples
+    
+    print("="*70)
+    print("🎓 SENTIMENT STUDENT DISTILLATION")
+    print("="*70)
+    
+    financial_df = HuggingFaceDataLoader().load_financial_dataset()
+    texts = financial_df['text'].tolist()
+    
+    if args.labels == 'gold':
+        labels = financial_df['sentiment'].tolist()
+    else:
+        labels = teacher_labels(texts)
+    
+    report = train_student(texts, labels, label_source=args.labels, path=args.output)
+    
+    print(f"\n✅ Student agreement with {args.labels} labels: {report['agreement']*100:.1f}% "
+          f"({report['texts_per_sec']:.0f} texts/s)")
+
+if __name__ == "__main__":
+    main()
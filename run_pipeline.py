@@ -10,7 +10,7 @@ sys.path.append(str(Path(__file__).parent))
 
 from config import config
 from src.data_collection.stock_collector import StockCollector
-from src.sentiment.sentiment_factor import create_sentiment_analyzer
+from src.sentiment.sentiment_factor import get_sentiment_analyzer
 from src.models.feature_engineer import FeatureEngineer
 from src.models.predictor import StockPredictor
 
@@ -58,7 +58,8 @@ def main():
             logger.error("Failed to load stock data")
             return
         
-        stock_collector.save(stock_df)
+        if stock_collector.store is None:
+            stock_collector.save(stock_df)  # The market data store already keeps the bars
         
         # Combine datasets
         combined_df = hf_loader.create_stock_news_dataset(
@@ -85,13 +86,17 @@ def main():
         print("STEP 2: SENTIMENT ANALYSIS")
         print("="*70)
         
-        # Create appropriate sentiment analyzer
-        sentiment_analyzer = create_sentiment_analyzer()
+        # Create appropriate sentiment analyzer ('gold' reuses the dataset labels)
+        sentiment_analyzer = get_sentiment_analyzer(config.PIPELINE_SENTIMENT_MODE)
         
-        # Analyze sentiment
+        # Tokenize the HF corpus once; repeat runs load ids from the Arrow cache
+        if config.HF_TOKEN_CACHE and hasattr(sentiment_analyzer, 'use_token_cache'):
+            sentiment_analyzer.use_token_cache(financial_df['text'])
+        
+        # Analyze sentiment (columnar: arrays straight into the frame)
         combined_df = sentiment_analyzer.analyze_dataframe(
             combined_df, 
-            text_column='news_text'
+            text_column=config.SENTIMENT_TEXT_COLUMN
         )
         
         # Save with sentiment
@@ -1,17 +1,17 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import joblib
-import pandas as pd
 import logging
 from pathlib import Path
 import sys
+from contextlib import nullcontext
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from config import config
-from src.sentiment.vader_analyzer import VADERSentimentAnalyzer
-from src.sentiment.sentiment_factor import create_sentiment_analyzer
+from src.sentiment.sentiment_factor import get_sentiment_analyzer, warmup
+from src.sentiment.sentiment_cache import get_sentiment_cache
+from src.sentiment.model_registry import get_model_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,11 +32,15 @@ def load_models():
     
     logger.info("Loading models...")
     
-    # Load sentiment analyzer
-    sentiment_analyzer = create_sentiment_analyzer()
+    # Load sentiment analyzer (shared instance, warmed before first request)
+    sentiment_analyzer = get_sentiment_analyzer()
+    if config.SENTIMENT_WARMUP:
+        warmup()
     
     # Load predictor and preprocessing
     try:
+        import joblib
+        
         model_path = config.MODELS_DIR / "stock_predictor.pkl"
         predictor_model = joblib.load(model_path)
         logger.info("✅ Predictor model loaded")
@@ -51,6 +55,20 @@ def load_models():
         logger.error(f"❌ Error loading models: {e}")
         logger.warning("⚠️  Run pipeline first to train models!")
 
+def resolve_analyzer(data):
+    """
+    Context manager yielding the analyzer for a request: the named model
+    from the registry if 'model' is given, else the default sentiment
+    analyzer (registry models stay loaded until the block exits)
+    
+    Raises:
+        KeyError: unknown model name
+    """
+    model = data.get('model')
+    if model is None:
+        return nullcontext(sentiment_analyzer)
+    return get_model_registry().use(model)
+
 # Load models on startup
 load_models()
 
@@ -67,6 +85,7 @@ def home():
             'GET /health': 'Health check',
             'POST /sentiment': 'Analyze text sentiment',
             'POST /predict': 'Predict stock movement',
+            'GET /models': 'Named sentiment models and memory use',
             'GET /stats': 'Model statistics'
         }
     })
@@ -89,15 +108,39 @@ def analyze_sentiment():
     {
         "text": "Apple announces record profits!"
     }
+    or, scored as one columnar batch:
+    {
+        "texts": ["Apple announces record profits!", "..."]
+    }
+    Either form takes an optional "model" (a name from GET /models).
     """
     try:
         data = request.json
+        try:
+            using_analyzer = resolve_analyzer(data)
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 400
+        
+        texts = data.get('texts')
+        
+        if texts is not None:
+            if not isinstance(texts, list) or not texts:
+                return jsonify({'error': 'texts must be a non-empty list'}), 400
+            
+            with using_analyzer as analyzer:
+                batch = analyzer.score_batch(texts)
+            return jsonify({
+                'texts': texts,
+                'sentiment': batch.to_records()
+            })
+        
         text = data.get('text', '')
         
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        result = sentiment_analyzer.analyze(text)
+        with using_analyzer as analyzer:
+            result = analyzer.analyze(text)
         
         return jsonify({
             'text': text,
@@ -119,7 +162,8 @@ def predict_stock():
         "news_text": "Apple announces...",
         "open_price": 150.0,
         "close_price": 152.0,
-        "volume": 1000000
+        "volume": 1000000,
+        "model": "financial-news"  (optional sentiment model, see GET /models)
     }
     """
     try:
@@ -128,11 +172,18 @@ def predict_stock():
                 'error': 'Model not loaded. Please train the model first.'
             }), 503
         
+        import pandas as pd
+        
         data = request.json
+        try:
+            using_analyzer = resolve_analyzer(data)
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 400
         
         # Get sentiment
         news_text = data.get('news_text', '')
-        sentiment = sentiment_analyzer.analyze(news_text)
+        with using_analyzer as analyzer:
+            sentiment = analyzer.analyze(news_text)
         
         # Calculate price change
         open_price = data.get('open_price', 0)
@@ -202,13 +253,20 @@ def predict_stock():
         logger.error(f"Error in prediction: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/models')
+def list_models():
+    """Named sentiment models: available, loaded, and memory against the budget"""
+    return jsonify(get_model_registry().stats())
+
 @app.route('/stats')
 def get_stats():
     """Get model statistics"""
+    cache = get_sentiment_cache()
     return jsonify({
         'model_type': 'Random Forest',
         'features_count': len(feature_columns) if feature_columns else 0,
         'sentiment_analyzer': 'VADER',
+        'sentiment_cache': cache.stats() if cache is not None else None,
         'training_samples': 'See logs for details'
     })
 
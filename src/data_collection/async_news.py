@@ -0,0 +1,275 @@
+"""
+Asynchronous NewsAPI + Finnhub collection
+
+Every request goes through its provider's token bucket (sustained rate
+plus burst) and a semaphore bounding in-flight requests, and is retried
+with exponential backoff on 429 / 5xx / network errors. Both providers
+run concurrently, so collection time tracks the providers' rate limits
+rather than a fixed sleep per call. A failed query is logged and counted
+without stopping the others, and malformed items are skipped or get
+empty fields. Base URLs come from config.NEWS_PROVIDERS, so a local stub
+server can stand in for the APIs.
+"""
+import asyncio
+import random
+import time
+import logging
+from datetime import datetime, timezone
+import aiohttp
+from config import config
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def _text(value):
+    """String field of an API item ('' for null or missing)"""
+    return value if isinstance(value, str) else ''
+
+def _field(value, key):
+    """value[key] if value is a dict, else None"""
+    return value.get(key) if isinstance(value, dict) else None
+
+def _timestamp(value):
+    """ISO time of a Unix timestamp, None if missing or invalid"""
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc).isoformat()
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens per second, holding at most `capacity`
+    """
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class Provider:
+    """One news API: limiter, concurrency bound and request counters"""
+    
+    def __init__(self, name, api_key, base_url, rate_per_sec, burst, concurrency):
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'articles': 0}
+
+class AsyncNewsCollector:
+    """
+    Concurrent company news from NewsAPI (keyword search) and Finnhub
+    (company-news by symbol)
+    """
+    
+    def __init__(self, api_keys=None, providers=None, max_retries=None, backoff=None, timeout=None,
+                 max_retry_after=None):
+        """
+        Args:
+            api_keys: {'newsapi': key, 'finnhub': key}; providers without a
+                key are skipped (default from config)
+            providers: Per-provider base_url / rate_per_sec / burst /
+                concurrency (default config.NEWS_PROVIDERS)
+            max_retries: Retries per request (default from config)
+            backoff: Base backoff seconds, doubled per retry (default from config)
+            timeout: Per-request timeout in seconds (default from config)
+            max_retry_after: Longest Retry-After wait honoured, in seconds
+                (default from config)
+        """
+        if api_keys is None:
+            api_keys = {'newsapi': config.NEWS_API_KEY, 'finnhub': config.FINNHUB_API_KEY}
+        if providers is None:
+            providers = config.NEWS_PROVIDERS
+        if max_retries is None:
+            max_retries = config.NEWS_MAX_RETRIES
+        if backoff is None:
+            backoff = config.NEWS_BACKOFF_SECONDS
+        if timeout is None:
+            timeout = config.NEWS_REQUEST_TIMEOUT
+        if max_retry_after is None:
+            max_retry_after = config.NEWS_MAX_RETRY_AFTER
+        
+        self.api_keys = api_keys
+        self.provider_settings = providers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_retry_after = max_retry_after
+        self.providers = {}
+    
+    async def collect(self, symbols, start_date, end_date, keywords_per_symbol=None):
+        """
+        Query every provider for every symbol concurrently
+        
+        Returns:
+            list: article dicts (title, description, content, url, source,
+                published_at, symbol, keyword, provider)
+        """
+        if keywords_per_symbol is None:
+            keywords_per_symbol = config.NEWS_KEYWORDS_PER_SYMBOL
+        
+        # Limiters bind to the running loop, so build them per collection
+        self.providers = {
+            name: Provider(name, self.api_keys.get(name), **settings)
+            for name, settings in self.provider_settings.items()
+            if self.api_keys.get(name)
+        }
+        for name in self.provider_settings:
+            if name not in self.providers:
+                logger.warning(f"{name} key not found, skipping")
+        
+        start = time.perf_counter()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            tasks = []  # (provider, query, coroutine)
+            for symbol in symbols:
+                if 'newsapi' in self.providers:
+                    for keyword in config.COMPANY_MAPPINGS.get(symbol, [symbol])[:keywords_per_symbol]:
+                        tasks.append(('newsapi', keyword, self._newsapi(session, symbol, keyword, start_date, end_date)))
+                if 'finnhub' in self.providers:
+                    tasks.append(('finnhub', symbol, self._finnhub(session, symbol, start_date, end_date)))
+            
+            results = await asyncio.gather(*(coro for _, _, coro in tasks), return_exceptions=True)
+        
+        articles = []
+        for (name, query, _), result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                self.providers[name].stats['failures'] += 1
+                logger.error(f"❌ {name} '{query}': {type(result).__name__}: {result}")
+                continue
+            articles.extend(result)
+        elapsed = time.perf_counter() - start
+        for provider in self.providers.values():
+            logger.info(f"{provider.name}: {provider.stats['requests']} requests, {provider.stats['retries']} retries, "
+                        f"{provider.stats['failures']} failed, {provider.stats['articles']} articles")
+        logger.info(f"Collected {len(articles)} articles from {len(tasks)} queries in {elapsed:.1f}s")
+        return articles
+    
+    async def _get(self, session, provider, path, params, headers=None):
+        """
+        Rate-limited GET with retries; returns parsed JSON or None on failure
+        """
+        url = f"{provider.base_url}/{path}"
+        
+        for attempt in range(self.max_retries + 1):
+            async with provider.semaphore:
+                await provider.bucket.acquire()
+                provider.stats['requests'] += 1
+                try:
+                    async with session.get(url, params=params, headers=headers) as response:
+                        if response.status == 200:
+                            try:
+                                # Parse whatever the content type claims; a body
+                                # that is not JSON fails the query, without retries
+                                return await response.json(content_type=None)
+                            except ValueError as e:
+                                logger.error(f"❌ {provider.name} {path}: response is not JSON ({e})")
+                                break
+                        
+                        if response.status not in RETRY_STATUSES:
+                            logger.error(f"❌ {provider.name} {path}: HTTP {response.status}")
+                            break
+                        retry_after = response.headers.get('Retry-After')
+                        error = f"HTTP {response.status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    retry_after = None
+                    error = str(e) or type(e).__name__
+            
+            if attempt == self.max_retries:
+                logger.error(f"❌ {provider.name} {path}: {error} after {attempt + 1} attempts")
+                break
+            
+            # Honour Retry-After when given (up to max_retry_after), else
+            # exponential backoff with jitter
+            provider.stats['retries'] += 1
+            try:
+                delay = min(max(float(retry_after), 0.0), self.max_retry_after)
+            except (TypeError, ValueError):
+                delay = self.backoff * 2 ** attempt * (1 + random.random())
+            await asyncio.sleep(delay)
+        
+        provider.stats['failures'] += 1
+        return None
+    
+    async def _newsapi(self, session, symbol, keyword, start_date, end_date):
+        provider = self.providers['newsapi']
+        params = {
+            'q': keyword,
+            'from': start_date.strftime('%Y-%m-%d'),
+            'to': end_date.strftime('%Y-%m-%d'),
+            'language': 'en',
+            'sortBy': 'relevancy',
+            'pageSize': 20
+        }
+        result = await self._get(session, provider, 'everything', params, headers={'X-Api-Key': provider.api_key})
+        if not isinstance(result, dict) or result.get('status') != 'ok':
+            return []
+        
+        items = result.get('articles')
+        articles = [
+            {
+                'title': _text(article.get('title')),
+                'description': _text(article.get('description')),
+                'content': _text(article.get('content')),
+                'url': _text(article.get('url')),
+                'source': _text(_field(article.get('source'), 'name')),
+                'published_at': _text(article.get('publishedAt')) or None,
+                'symbol': symbol,
+                'keyword': keyword,
+                'provider': 'newsapi'
+            }
+            for article in (items if isinstance(items, list) else [])
+            if isinstance(article, dict)
+        ]
+        provider.stats['articles'] += len(articles)
+        return articles
+    
+    async def _finnhub(self, session, symbol, start_date, end_date):
+        provider = self.providers['finnhub']
+        params = {
+            'symbol': symbol,
+            'from': start_date.strftime('%Y-%m-%d'),
+            'to': end_date.strftime('%Y-%m-%d'),
+            'token': provider.api_key
+        }
+        result = await self._get(session, provider, 'company-news', params)
+        if not isinstance(result, list):
+            return []
+        
+        articles = [
+            {
+                'title': _text(item.get('headline')),
+                'description': _text(item.get('summary')),
+                'content': '',
+                'url': _text(item.get('url')),
+                'source': _text(item.get('source')),
+                'published_at': _timestamp(item.get('datetime')),
+                'symbol': symbol,
+                'keyword': symbol,
+                'provider': 'finnhub'
+            }
+            for item in result
+            if isinstance(item, dict)
+        ]
+        provider.stats['articles'] += len(articles)
+        return articles
+    
+    def stats(self):
+        """Request/retry/failure/article counts per provider for the last collection"""
+        return {name: dict(provider.stats) for name, provider in self.providers.items()}
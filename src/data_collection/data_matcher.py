@@ -55,6 +55,7 @@ class DataMatcher:
                     'symbol': symbol,
                     'news_title': news_row['title'],
                     'news_description': news_row.get('description', ''),
+                    config.SENTIMENT_TEXT_COLUMN: news_row.get(config.SENTIMENT_TEXT_COLUMN, news_row['title']),
                     'news_source': news_row.get('source', ''),
                     'news_date': news_row['news_date'],
                     'stock_date': stock_row['stock_date'],
@@ -1,98 +1,61 @@
 """
 News data collection from multiple sources
 """
+import asyncio
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from newsapi import NewsApiClient
-import finnhub
-import time
 from config import config
+from src.data_collection.async_news import AsyncNewsCollector
+from src.sentiment.text_normalizer import article_text
 
 logger = logging.getLogger(__name__)
 
+def _run(coro):
+    """Run a coroutine to completion, also from inside a running event loop (notebooks)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
 class NewsCollector:
-    def __init__(self):
-        if config.NEWS_API_KEY:
-            self.newsapi = NewsApiClient(api_key=config.NEWS_API_KEY)
-        else:
-            self.newsapi = None
-            logger.warning("NewsAPI key not found")
-        
-        if config.FINNHUB_API_KEY:
-            self.finnhub = finnhub.Client(api_key=config.FINNHUB_API_KEY)
-        else:
-            self.finnhub = None
-            logger.warning("Finnhub key not found")
+    def __init__(self, api_keys=None, providers=None):
+        """
+        Args:
+            api_keys: {'newsapi': key, 'finnhub': key} (default from config)
+            providers: Per-provider base URL and limits (default config.NEWS_PROVIDERS)
+        """
+        # Providers without a key are skipped (with a warning) at collection time
+        self.engine = AsyncNewsCollector(api_keys=api_keys, providers=providers)
     
     def collect_news(self, symbols=None, days_back=30):
-        """Collect news for specified symbols"""
+        """Collect news for specified symbols from NewsAPI and Finnhub concurrently"""
         if symbols is None:
             symbols = config.STOCK_SYMBOLS
         
         logger.info(f"Collecting news for {len(symbols)} symbols, {days_back} days back")
         
-        all_articles = []
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        for symbol in symbols:
-            if symbol in config.COMPANY_MAPPINGS:
-                # Use company keywords
-                keywords = config.COMPANY_MAPPINGS[symbol]
-                
-                for keyword in keywords[:2]:  # Limit keywords to avoid rate limits
-                    articles = self._fetch_newsapi(keyword, start_date, end_date)
-                    
-                    for article in articles:
-                        article['symbol'] = symbol
-                        article['keyword'] = keyword
-                    
-                    all_articles.extend(articles)
-                    time.sleep(1)  # Rate limiting
+        all_articles = _run(self.engine.collect(symbols, start_date, end_date))
         
         df = pd.DataFrame(all_articles)
         
         if not df.empty:
-            df['published_at'] = pd.to_datetime(df['published_at'])
+            df['published_at'] = pd.to_datetime(df['published_at'], format='ISO8601', utc=True)
             df = df.drop_duplicates(subset=['title', 'symbol'])
             df = df.sort_values('published_at', ascending=False)
+            # The text sentiment analyzers score: title, description and content joined
+            df[config.SENTIMENT_TEXT_COLUMN] = article_text(df)
         
         logger.info(f"Collected {len(df)} articles")
         return df
     
-    def _fetch_newsapi(self, query, from_date, to_date):
-        """Fetch from NewsAPI"""
-        if not self.newsapi:
-            return []
-        
-        try:
-            result = self.newsapi.get_everything(
-                q=query,
-                from_param=from_date.strftime('%Y-%m-%d'),
-                to=to_date.strftime('%Y-%m-%d'),
-                language='en',
-                sort_by='relevancy',
-                page_size=20
-            )
-            
-            if result['status'] == 'ok':
-                articles = []
-                for article in result['articles']:
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('description', ''),
-                        'content': article.get('content', ''),
-                        'url': article.get('url', ''),
-                        'source': article.get('source', {}).get('name', ''),
-                        'published_at': article.get('publishedAt', '')
-                    })
-                return articles
-        except Exception as e:
-            logger.error(f"Error fetching news: {e}")
-        
-        return []
-    
     def save(self, df, filename=None):
         """Save news data"""
         if filename is None:
@@ -0,0 +1,142 @@
+"""
+Local OHLCV store: one Parquet partition per symbol
+
+    MARKET_DATA_DIR/symbol=AAPL/bars.parquet   daily bars, date-indexed
+    MARKET_DATA_DIR/symbol=AAPL/meta.json      window covered, last bar
+
+StockCollector appends only the bars after each symbol's last stored one
+and answers collect_stock_data from here, so a 60-day and a multi-year
+window cost the same network time once the store is warm.
+"""
+import json
+import os
+import logging
+import pandas as pd
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Window start for period='max'; earlier than any listing
+EARLIEST = pd.Timestamp('1900-01-01')
+
+# yfinance period suffixes -> offsets
+PERIOD_OFFSETS = {
+    'd': lambda n: pd.DateOffset(days=n),
+    'wk': lambda n: pd.DateOffset(weeks=n),
+    'mo': lambda n: pd.DateOffset(months=n),
+    'y': lambda n: pd.DateOffset(years=n),
+}
+
+def period_start(period, now=None):
+    """
+    First date a yfinance period ('60d', '6mo', '5y', 'ytd', 'max') covers
+    
+    Returns:
+        pd.Timestamp: tz-naive midnight (EARLIEST for 'max')
+    """
+    if now is None:
+        now = pd.Timestamp.now()
+    now = now.normalize()
+    
+    if period == 'max':
+        return EARLIEST
+    if period == 'ytd':
+        return now.replace(month=1, day=1)
+    
+    for unit, offset in PERIOD_OFFSETS.items():
+        count = period[:-len(unit)]
+        if period.endswith(unit) and count.isdigit():
+            return now - offset(int(count))
+    
+    raise ValueError(f"Unsupported period '{period}'")
+
+def naive_dates(index):
+    """Wall-clock dates of a (possibly exchange-tz) DatetimeIndex"""
+    return index.tz_localize(None) if index.tz is not None else index
+
+class OHLCVStore:
+    """
+    Symbol-partitioned Parquet store of daily bars
+    """
+    
+    def __init__(self, root=None):
+        if root is None:
+            root = config.MARKET_DATA_DIR
+        
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def _partition(self, symbol):
+        return self.root / f"symbol={symbol}"
+    
+    def symbols(self):
+        """Symbols with stored bars"""
+        return sorted(p.name.split('=', 1)[1] for p in self.root.glob("symbol=*") if (p / "meta.json").exists())
+    
+    def meta(self, symbol):
+        """
+        Partition metadata, or None if the symbol is not stored
+        
+        covered_from is the earliest window start fetched in full; it can
+        predate the first bar (e.g. recent listings).
+        """
+        path = self._partition(symbol) / "meta.json"
+        if not path.exists():
+            return None
+        
+        meta = json.loads(path.read_text())
+        meta['covered_from'] = pd.Timestamp(meta['covered_from'])
+        meta['last_bar'] = pd.Timestamp(meta['last_bar'])
+        return meta
+    
+    def read(self, symbol, start=None):
+        """Stored bars from `start` on (all if None); empty DataFrame if none"""
+        path = self._partition(symbol) / "bars.parquet"
+        if not path.exists():
+            return pd.DataFrame()
+        
+        bars = pd.read_parquet(path)
+        if start is not None:
+            bars = bars[naive_dates(bars.index) >= start]
+        return bars
+    
+    def write(self, symbol, bars, covered_from=None, replace=False):
+        """
+        Merge fetched bars into a symbol's partition
+        
+        Stored bars for the same dates are overwritten: the last bar of an
+        earlier run may have been an unfinished session.
+        
+        Args:
+            bars: Date-indexed OHLCV from yfinance
+            covered_from: Window start of a full fetch (None for an
+                incremental one, which keeps the recorded coverage)
+            replace: Drop stored bars first (prices were re-adjusted)
+        """
+        partition = self._partition(symbol)
+        partition.mkdir(parents=True, exist_ok=True)
+        
+        meta = None if replace else self.meta(symbol)
+        if meta is not None:
+            bars = pd.concat([self.read(symbol), bars])
+            bars = bars[~bars.index.duplicated(keep='last')]
+            covered_from = meta['covered_from'] if covered_from is None else min(covered_from, meta['covered_from'])
+        bars = bars.sort_index()
+        
+        if covered_from is None:
+            covered_from = naive_dates(bars.index).min().normalize()
+        
+        # Write-then-rename so a crash never leaves a truncated partition;
+        # meta.json goes last and marks the partition as complete
+        tmp = partition / "bars.parquet.tmp"
+        bars.to_parquet(tmp)
+        os.replace(tmp, partition / "bars.parquet")
+        
+        tmp = partition / "meta.json.tmp"
+        tmp.write_text(json.dumps({
+            'covered_from': covered_from.isoformat(),
+            'last_bar': naive_dates(bars.index).max().isoformat(),
+            'rows': len(bars)
+        }, indent=2))
+        os.replace(tmp, partition / "meta.json")
+        return bars
@@ -5,60 +5,256 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import config
+from src.data_collection.ohlcv_store import OHLCVStore, EARLIEST, period_start, naive_dates
+from src.data_collection.indicators import add_indicators
 
 logger = logging.getLogger(__name__)
 
 class StockCollector:
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, fetch_mode=None, max_workers=None, chunk_size=None, use_store=None):
+        """
+        Args:
+            fetch_mode: 'sequential', 'threads' (bounded pool of
+                Ticker.history calls) or 'download' (yfinance multi-ticker
+                download per chunk); default from config
+            max_workers: Concurrent requests (default from config)
+            chunk_size: Symbols per chunk (default from config)
+            use_store: Serve bars from the local Parquet store, fetching
+                only what it is missing (default from config)
+        """
+        if fetch_mode is None:
+            fetch_mode = config.STOCK_FETCH_MODE
+        if max_workers is None:
+            max_workers = config.STOCK_FETCH_WORKERS
+        if chunk_size is None:
+            chunk_size = config.STOCK_FETCH_CHUNK_SIZE
+        if use_store is None:
+            use_store = config.STOCK_STORE
+        
+        self.store = OHLCVStore() if use_store else None
+        self.fetch_mode = fetch_mode
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = max(1, chunk_size)
+        self.fetch_times = {}  # symbol -> {'seconds', 'rows', 'error'} for the last collection
     
     def collect_stock_data(self, symbols=None, period="30d"):
         """Collect stock data for symbols"""
         if symbols is None:
             symbols = config.STOCK_SYMBOLS
+        symbols = list(dict.fromkeys(symbols))
+        
+        logger.info(f"Collecting stock data for {len(symbols)} symbols ({self.fetch_mode})")
         
-        logger.info(f"Collecting stock data for {len(symbols)} symbols")
+        start = time.perf_counter()
+        self.fetch_times = {}
+        if self.store is None:
+            histories = self._fetch({symbol: {'period': period} for symbol in symbols})
+        else:
+            histories = self._update_store(symbols, period)
         
         all_data = []
         for symbol in symbols:
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period)
-                
-                if not hist.empty:
-                    hist['symbol'] = symbol
-                    hist['date'] = hist.index
-                    
-                    # Calculate indicators
-                    hist['price_change_pct'] = hist['Close'].pct_change() * 100
-                    hist['high_low_pct'] = ((hist['High'] - hist['Low']) / hist['Low']) * 100
-                    hist['volume_ma_5'] = hist['Volume'].rolling(window=5).mean()
-                    
-                    # RSI
-                    hist['rsi'] = self._calculate_rsi(hist['Close'])
-                    
-                    # Price direction
-                    hist['price_direction'] = hist['price_change_pct'].apply(
-                        lambda x: 1 if x > 0 else -1 if x < 0 else 0
-                    )
-                    
-                    all_data.append(hist.reset_index(drop=True))
-                    logger.info(f"✅ {symbol}: {len(hist)} records")
+            hist = histories.get(symbol)
+            if hist is None or hist.empty:
+                continue
             
-            except Exception as e:
-                logger.error(f"❌ {symbol}: {e}")
+            hist = hist.assign(symbol=symbol, date=hist.index).reset_index(drop=True)
+            all_data.append(hist)
+            logger.info(f"✅ {symbol}: {len(hist)} records")
+        
+        self._log_fetch_times(time.perf_counter() - start)
         
         if all_data:
-            df = pd.concat(all_data, ignore_index=True)
+            # One vectorized pass over every symbol's bars
+            df = add_indicators(pd.concat(all_data, ignore_index=True))
             logger.info(f"Total stock records: {len(df)}")
             return df
         
         return pd.DataFrame()
     
+    def _update_store(self, symbols, period):
+        """
+        Bring each symbol's partition up to date, then read the window from disk
+        
+        Symbols whose stored bars do not reach back to the window start are
+        fetched in full; the rest only from their last stored bar. A split
+        or dividend in new bars re-adjusts past prices, so those symbols are
+        refetched over their whole stored range.
+        """
+        window_start = period_start(period)
+        
+        requests, full, metas = {}, set(), {}
+        for symbol in symbols:
+            meta = metas[symbol] = self.store.meta(symbol)
+            if meta is None or meta['covered_from'] > window_start:
+                requests[symbol] = {'period': period}
+                full.add(symbol)
+            else:
+                requests[symbol] = {'start': meta['last_bar'].strftime('%Y-%m-%d')}
+        
+        logger.info(f"Market data store: {len(full)} full fetches, {len(requests) - len(full)} incremental")
+        
+        rebased = {}
+        for symbol, bars in self._fetch(requests).items():
+            if bars is None or bars.empty:
+                if metas[symbol] is not None:
+                    logger.warning(f"⚠️  {symbol}: no new bars fetched, serving stored data")
+                continue
+            
+            if symbol in full:
+                self.store.write(symbol, bars, covered_from=window_start, replace=True)
+            elif self._has_corporate_action(bars, metas[symbol]['last_bar']):
+                covered_from = metas[symbol]['covered_from']
+                rebased[symbol] = {'period': 'max'} if covered_from <= EARLIEST else {'start': covered_from.strftime('%Y-%m-%d')}
+            else:
+                self.store.write(symbol, bars)
+        
+        if rebased:
+            logger.info(f"Refetching {len(rebased)} symbols after splits/dividends: {', '.join(list(rebased)[:10])}")
+            for symbol, bars in self._fetch(rebased).items():
+                if bars is not None and not bars.empty:
+                    self.store.write(symbol, bars, covered_from=metas[symbol]['covered_from'], replace=True)
+        
+        return {symbol: self.store.read(symbol, start=window_start) for symbol in symbols}
+    
+    @staticmethod
+    def _has_corporate_action(bars, last_bar):
+        """Whether bars after last_bar include a dividend or split"""
+        new = bars[naive_dates(bars.index) > last_bar]
+        actions = [col for col in ('Dividends', 'Stock Splits') if col in new.columns]
+        return bool(actions) and bool((new[actions].fillna(0) != 0).any().any())
+    
+    def _fetch(self, requests):
+        """
+        Fetch {symbol: history kwargs} with the configured mode
+        
+        Returns:
+            dict: symbol -> history DataFrame (None where the fetch failed)
+        """
+        if self.fetch_mode == 'download':
+            return self._fetch_bulk(requests)
+        if self.fetch_mode == 'threads':
+            return self._fetch_threaded(requests)
+        return {symbol: self._fetch_one(symbol, **kwargs) for symbol, kwargs in requests.items()}
+    
+    def _chunks(self, symbols):
+        return [symbols[i:i+self.chunk_size] for i in range(0, len(symbols), self.chunk_size)]
+    
+    def _fetch_one(self, symbol, **kwargs):
+        """One symbol's history (period= or start=), or None on error (never raises)"""
+        start = time.perf_counter()
+        try:
+            hist = yf.Ticker(symbol).history(**kwargs)
+            self.fetch_times[symbol] = {'seconds': time.perf_counter() - start, 'rows': len(hist), 'error': None}
+            return hist
+        except Exception as e:
+            self.fetch_times[symbol] = {'seconds': time.perf_counter() - start, 'rows': 0, 'error': str(e)}
+            logger.error(f"❌ {symbol}: {e}")
+            return None
+    
+    def _fetch_threaded(self, requests):
+        """Ticker.history for every symbol through a bounded thread pool, chunk by chunk"""
+        symbols = list(requests)
+        histories = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(symbols) or 1)) as pool:
+            for i, chunk in enumerate(self._chunks(symbols)):
+                fetched = pool.map(lambda symbol: self._fetch_one(symbol, **requests[symbol]), chunk)
+                histories.update(zip(chunk, fetched))
+                logger.info(f"Fetched chunk {i + 1} ({len(histories)}/{len(symbols)} symbols)")
+        return histories
+    
+    def _fetch_bulk(self, requests):
+        """
+        One yfinance multi-ticker download per chunk of symbols sharing
+        the same period/start
+        
+        Symbols missing from a chunk's result (or a failed chunk) are
+        retried one by one, so a bad ticker never costs the others.
+        """
+        groups = {}
+        for symbol, kwargs in requests.items():
+            groups.setdefault(tuple(sorted(kwargs.items())), []).append(symbol)
+        
+        histories = {}
+        failed = {}
+        
+        chunks = [(dict(key), chunk) for key, symbols in groups.items() for chunk in self._chunks(symbols)]
+        for i, (kwargs, chunk) in enumerate(chunks):
+            start = time.perf_counter()
+            try:
+                frame = yf.download(
+                    chunk,
+                    **kwargs,
+                    group_by='ticker',
+                    actions=True,
+                    auto_adjust=True,  # Same prices and columns as Ticker.history
+                    ignore_tz=False,
+                    threads=min(self.max_workers, len(chunk)),
+                    progress=False
+                )
+            except Exception as e:
+                logger.error(f"❌ Bulk download of chunk {i + 1} failed: {e}")
+                frame = pd.DataFrame()
+            
+            # One request serves the whole chunk: charge each symbol its share
+            seconds = (time.perf_counter() - start) / len(chunk)
+            for symbol in chunk:
+                hist = self._symbol_frame(frame, symbol)
+                if hist is None:
+                    failed[symbol] = kwargs
+                else:
+                    histories[symbol] = hist
+                    self.fetch_times[symbol] = {'seconds': seconds, 'rows': len(hist), 'error': None}
+            
+            logger.info(f"Downloaded chunk {i + 1}/{len(chunks)} ({len(histories)}/{len(requests)} symbols)")
+        
+        if failed:
+            logger.warning(f"⚠️  Retrying {len(failed)} symbols individually: {', '.join(list(failed)[:10])}")
+            histories.update(self._fetch_threaded(failed))
+        
+        return histories
+    
+    @staticmethod
+    def _symbol_frame(frame, symbol):
+        """One symbol's OHLCV from a multi-ticker download, or None if absent"""
+        if frame.empty:
+            return None
+        
+        if isinstance(frame.columns, pd.MultiIndex):
+            if symbol not in frame.columns.get_level_values(0):
+                return None
+            hist = frame[symbol]
+        else:
+            hist = frame
+        
+        hist = hist.dropna(subset=['Close'])
+        return hist if not hist.empty else None
+    
+    def _log_fetch_times(self, total_seconds):
+        """Summarize per-symbol fetch times (details stay in self.fetch_times)"""
+        if not self.fetch_times:
+            return
+        
+        ok = {s: t for s, t in self.fetch_times.items() if t['error'] is None}
+        logger.info(f"Fetched {len(ok)}/{len(self.fetch_times)} symbols in {total_seconds:.1f}s")
+        
+        if ok:
+            seconds = np.array([t['seconds'] for t in ok.values()])
+            slowest = sorted(ok, key=lambda s: ok[s]['seconds'], reverse=True)[:3]
+            slowest = ', '.join(f"{s} {ok[s]['seconds']:.2f}s" for s in slowest)
+            logger.info(f"Per symbol: median {np.median(seconds):.2f}s, max {seconds.max():.2f}s "
+                        f"(slowest: {slowest})")
+    
+    def fetch_report(self):
+        """Per-symbol fetch time, rows and error of the last collection as a DataFrame"""
+        return pd.DataFrame.from_dict(self.fetch_times, orient='index').rename_axis('symbol').reset_index()
+    
     def _calculate_rsi(self, prices, period=14):
-        """Calculate RSI indicator"""
+        """Calculate RSI indicator for one series (add_indicators computes it for all symbols)"""
         delta = prices.diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
@@ -74,4 +270,4 @@ class StockCollector:
         filepath = config.RAW_DATA_DIR / filename
         df.to_csv(filepath, index=False)
         logger.info(f"Saved stock data to {filepath}")
-        return filepath
\ No newline at end of file
+        return filepath
@@ -0,0 +1,295 @@
+"""
+Incremental indicator state for live (intraday) bars
+
+Each symbol keeps a few small __slots__ objects (RSI, EMA, rolling volume
+mean) whose update() costs O(1) per bar: ring buffers in array('d') plus
+running sums, instead of recomputing rolling means over the whole series.
+State round-trips through plain dicts / JSON so a restarted process picks
+up where it stopped.
+
+With the default 'sma' smoothing, RSI replays to the same values as
+StockCollector._calculate_rsi and the batch 'rsi' column; 'wilder' gives
+Wilder's smoothed RSI instead.
+"""
+import json
+import math
+import logging
+from array import array
+from config import config
+
+logger = logging.getLogger(__name__)
+
+class EMAState:
+    """Exponential moving average, same as pandas ewm(span, adjust=False)"""
+    
+    __slots__ = ('alpha', 'value')
+    
+    def __init__(self, span=None, alpha=None):
+        if alpha is None:
+            alpha = 2 / ((span if span is not None else config.STREAM_EMA_SPAN) + 1)
+        self.alpha = alpha
+        self.value = math.nan
+    
+    def update(self, x):
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+    
+    def to_dict(self):
+        return {'alpha': self.alpha, 'value': self.value}
+    
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(alpha=state['alpha'])
+        obj.value = state['value']
+        return obj
+
+class RollingMeanState:
+    """Mean of the last `window` values (NaN until the window is full)"""
+    
+    __slots__ = ('window', 'buffer', 'index', 'count', 'total')
+    
+    def __init__(self, window=None):
+        if window is None:
+            window = config.VOLUME_MA_WINDOW
+        self.window = window
+        self.buffer = array('d', [0.0]) * window
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+    
+    def update(self, x):
+        self.total += x - self.buffer[self.index]
+        self.buffer[self.index] = x
+        self.index = (self.index + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        if self.index == 0:
+            self.total = sum(self.buffer)  # Once per window: no drift, still O(1) amortized
+        return self.value
+    
+    @property
+    def value(self):
+        return self.total / self.window if self.count == self.window else math.nan
+    
+    def to_dict(self):
+        return {'window': self.window, 'buffer': self.buffer.tolist(), 'index': self.index,
+                'count': self.count, 'total': self.total}
+    
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'])
+        obj.buffer = array('d', state['buffer'])
+        obj.index, obj.count, obj.total = state['index'], state['count'], state['total']
+        return obj
+
+class RSIState:
+    """
+    Relative strength index over closes
+    
+    smoothing='sma': simple means of the last `period` gains and losses,
+        the first bar counting as a zero change (matches _calculate_rsi)
+    smoothing='wilder': Wilder's recursive average, seeded with the simple
+        mean of the first `period` changes
+    """
+    
+    __slots__ = ('period', 'smoothing', 'prev_close', 'gains', 'losses', 'index', 'count',
+                 'gain_sum', 'loss_sum', 'gain_nonzero', 'loss_nonzero')
+    
+    def __init__(self, period=None, smoothing=None):
+        if period is None:
+            period = config.RSI_PERIOD
+        if smoothing is None:
+            smoothing = config.STREAM_RSI_SMOOTHING
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown RSI smoothing '{smoothing}'")
+        
+        self.period = period
+        self.smoothing = smoothing
+        self.prev_close = math.nan
+        # Ring buffers of the window's gains/losses (sma only); Wilder keeps
+        # its running averages in gain_sum / loss_sum
+        self.gains = array('d', [0.0]) * period if smoothing == 'sma' else array('d')
+        self.losses = array('d', [0.0]) * period if smoothing == 'sma' else array('d')
+        self.index = 0
+        self.count = 0
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.gain_nonzero = 0
+        self.loss_nonzero = 0
+    
+    def update(self, close):
+        first = math.isnan(self.prev_close)
+        delta = 0.0 if first else close - self.prev_close
+        self.prev_close = close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        
+        if self.smoothing == 'wilder':
+            if first:
+                return math.nan
+            self.count += 1
+            if self.count <= self.period:
+                # Seed: simple mean of the first `period` changes
+                self.gain_sum += (gain - self.gain_sum) / self.count
+                self.loss_sum += (loss - self.loss_sum) / self.count
+            else:
+                self.gain_sum += (gain - self.gain_sum) / self.period
+                self.loss_sum += (loss - self.loss_sum) / self.period
+            return self._rsi(self.gain_sum, self.loss_sum) if self.count >= self.period else math.nan
+        
+        old_gain, old_loss = self.gains[self.index], self.losses[self.index]
+        self.gain_nonzero += (gain != 0) - (old_gain != 0)
+        self.loss_nonzero += (loss != 0) - (old_loss != 0)
+        # An all-zero window sums to exactly 0, whatever the running sum drifted to
+        self.gain_sum = self.gain_sum + gain - old_gain if self.gain_nonzero else 0.0
+        self.loss_sum = self.loss_sum + loss - old_loss if self.loss_nonzero else 0.0
+        self.gains[self.index], self.losses[self.index] = gain, loss
+        self.index = (self.index + 1) % self.period
+        self.count = min(self.count + 1, self.period)
+        if self.index == 0:
+            self.gain_sum, self.loss_sum = sum(self.gains), sum(self.losses)
+        
+        if self.count < self.period:
+            return math.nan
+        return self._rsi(self.gain_sum / self.period, self.loss_sum / self.period)
+    
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+    
+    def to_dict(self):
+        state = {slot: getattr(self, slot) for slot in self.__slots__}
+        state['gains'], state['losses'] = self.gains.tolist(), self.losses.tolist()
+        return state
+    
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['period'], state['smoothing'])
+        for slot in cls.__slots__:
+            setattr(obj, slot, state[slot])
+        obj.gains, obj.losses = array('d', state['gains']), array('d', state['losses'])
+        return obj
+
+class SymbolIndicators:
+    """One symbol's streaming indicator state"""
+    
+    __slots__ = ('rsi', 'ema', 'volume_ma', 'bars', 'last_time')
+    
+    def __init__(self, rsi=None, ema=None, volume_ma=None):
+        self.rsi = rsi if rsi is not None else RSIState()
+        self.ema = ema if ema is not None else EMAState()
+        self.volume_ma = volume_ma if volume_ma is not None else RollingMeanState()
+        self.bars = 0
+        self.last_time = None
+    
+    def update(self, close, volume, time=None):
+        """Feed one bar; returns the current indicator values"""
+        self.bars += 1
+        self.last_time = time
+        return {
+            'rsi': self.rsi.update(close),
+            'ema': self.ema.update(close),
+            'volume_ma': self.volume_ma.update(volume)
+        }
+    
+    def to_dict(self):
+        return {
+            'rsi': self.rsi.to_dict(),
+            'ema': self.ema.to_dict(),
+            'volume_ma': self.volume_ma.to_dict(),
+            'bars': self.bars,
+            'last_time': self.last_time
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(RSIState.from_dict(state['rsi']), EMAState.from_dict(state['ema']),
+                  RollingMeanState.from_dict(state['volume_ma']))
+        obj.bars, obj.last_time = state['bars'], state['last_time']
+        return obj
+
+class StreamingIndicators:
+    """
+    Streaming indicator state for many symbols
+    """
+    
+    def __init__(self, rsi_period=None, rsi_smoothing=None, ema_span=None, volume_window=None):
+        self.rsi_period = rsi_period
+        self.rsi_smoothing = rsi_smoothing
+        self.ema_span = ema_span
+        self.volume_window = volume_window
+        self.symbols = {}
+    
+    def _new_state(self):
+        return SymbolIndicators(
+            RSIState(self.rsi_period, self.rsi_smoothing),
+            EMAState(self.ema_span),
+            RollingMeanState(self.volume_window)
+        )
+    
+    def update(self, symbol, close, volume, time=None):
+        """
+        Feed one bar for a symbol (bars must arrive in time order)
+        
+        Returns:
+            dict: {'rsi', 'ema', 'volume_ma'} after this bar
+        """
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = self._new_state()
+        return state.update(float(close), float(volume), time)
+    
+    def replay(self, df, symbol_column='symbol', date_column='date'):
+        """
+        Warm the state from historical bars (e.g. the market data store)
+        
+        Returns:
+            pd.DataFrame: df in (symbol, date) order with rsi/ema/volume_ma
+                columns from the stream
+        """
+        df = df.sort_values([symbol_column, date_column], kind='stable') if date_column in df.columns else df
+        times = df[date_column].astype(str).tolist() if date_column in df.columns else [None] * len(df)
+        
+        rows = [
+            self.update(symbol, close, volume, time)
+            for symbol, close, volume, time in zip(df[symbol_column].tolist(), df['Close'].tolist(),
+                                                   df['Volume'].tolist(), times)
+        ]
+        return df.assign(
+            rsi=[r['rsi'] for r in rows],
+            ema=[r['ema'] for r in rows],
+            volume_ma=[r['volume_ma'] for r in rows]
+        )
+    
+    def to_dict(self):
+        return {symbol: state.to_dict() for symbol, state in self.symbols.items()}
+    
+    def save(self, path=None):
+        """Write all symbol states as JSON (for restarts)"""
+        if path is None:
+            path = config.STREAM_STATE_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(json.dumps(self.to_dict()))
+        tmp.replace(path)
+        logger.info(f"Saved streaming indicator state for {len(self.symbols)} symbols to {path}")
+        return path
+    
+    @classmethod
+    def load(cls, path=None, **params):
+        """Restore from save(); an empty instance if there is no state file"""
+        if path is None:
+            path = config.STREAM_STATE_PATH
+        
+        obj = cls(**params)
+        if path.exists():
+            obj.symbols = {
+                symbol: SymbolIndicators.from_dict(state)
+                for symbol, state in json.loads(path.read_text()).items()
+            }
+            logger.info(f"Restored streaming indicator state for {len(obj.symbols)} symbols")
+        return obj
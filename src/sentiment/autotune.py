@@ -0,0 +1,229 @@
+"""
+Auto-tuner for Hugging Face batch size and torch threads
+
+Sweeps batch sizes x intra-op thread counts on the current host with a
+short calibration set, keeps the highest throughput whose p95 batch
+latency fits the budget, and caches the choice per host and model in
+CACHE_DIR/hf_autotune.json. The sweep is an offline step:
+
+    python -m src.sentiment.autotune --model <name>
+
+Analyzers only apply settings already in the cache when they start, so
+no sweep ever runs next to models that are serving.
+"""
+import hashlib
+import json
+import os
+import platform
+import time
+import logging
+import numpy as np
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# torch's thread count is process-wide: the first tuned analyzer sets it
+_applied_threads = None
+
+def _host_fingerprint():
+    """Identify the host well enough that tuned settings stay valid"""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    return f"{platform.node()}|{platform.machine()}|{platform.processor()}|{cores} cores"
+
+def tune_key(analyzer):
+    """Cache key for one analyzer (model, backend, truncation) on this host"""
+    import torch
+    
+    payload = f"{_host_fingerprint()}|torch {torch.__version__}|{analyzer.backend}|{analyzer.model_id}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def _load(path):
+    if path.exists():
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable autotune cache {path}: {e}")
+    return {}
+
+def _save(path, tuned):
+    """Write-then-rename, so readers never see a half-written file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(tuned, indent=2))
+    os.replace(tmp, path)
+
+def apply_settings(analyzer, settings):
+    """
+    Set batch size, token budget and torch threads from tuned settings
+    
+    Threads are only set once per process; a later model tuned for a
+    different count keeps the existing setting rather than changing it
+    under the models already serving.
+    """
+    global _applied_threads
+    
+    analyzer.batch_size = settings['batch_size']
+    analyzer.max_batch_tokens = settings['max_batch_tokens']
+    
+    threads = settings.get('threads')
+    if threads and analyzer.backend == 'pytorch':
+        if _applied_threads is None:
+            import torch
+            torch.set_num_threads(threads)
+            _applied_threads = threads
+        elif threads != _applied_threads:
+            logger.warning(f"⚠️  Tuned for {threads} torch threads, keeping the process-wide {_applied_threads}")
+
+def _sweep_case(analyzer, texts, batch_size):
+    """
+    Time fixed-size batches through the production path (tokenize once,
+    then forward the ids); returns (texts/sec, p95 batch latency in ms)
+    
+    Raises whatever a batch raises, so a failing setting is never
+    recorded as a fast one.
+    """
+    batches = [texts[i:i+batch_size] for i in range(0, len(texts), batch_size)]
+    
+    latencies = []
+    for batch in batches:
+        start = time.perf_counter()
+        analyzer._token_probs(analyzer._encode(batch))
+        latencies.append(time.perf_counter() - start)
+    
+    total = sum(latencies)
+    return len(texts) / total if total else 0.0, float(np.percentile(latencies, 95) * 1000)
+
+def autotune(analyzer, texts=None, batch_sizes=None, thread_counts=None, latency_budget_ms=None,
+             force=False, path=None, sweep=False):
+    """
+    Tune an analyzer for this host, reusing cached settings when present
+    
+    Args:
+        analyzer: In-process HuggingFaceSentimentAnalyzer
+        texts: Calibration texts (default: synthetic headlines)
+        batch_sizes: Candidates (default from config)
+        thread_counts: torch intra-op thread candidates (default: 1, half
+            and all available cores; ignored for the ONNX backend)
+        latency_budget_ms: Max p95 latency per batch (default from config)
+        force: Sweep even if settings are cached
+        path: Cache file (default CACHE_DIR/hf_autotune.json)
+        sweep: Run the sweep when nothing is cached; otherwise keep the
+            config values (the sweep changes process-wide torch threads,
+            so it belongs in an offline run)
+    
+    Returns:
+        dict: the applied settings, or None if nothing was applied
+    """
+    if batch_sizes is None:
+        batch_sizes = config.HF_AUTOTUNE_BATCH_SIZES
+    if latency_budget_ms is None:
+        latency_budget_ms = config.HF_AUTOTUNE_LATENCY_MS
+    if path is None:
+        path = config.CACHE_DIR / "hf_autotune.json"
+    
+    key = tune_key(analyzer)
+    tuned = _load(path)
+    if key in tuned and not force:
+        settings = tuned[key]
+        apply_settings(analyzer, settings)
+        logger.info(f"🎛️  Using tuned settings: batch {settings['batch_size']}, "
+                    f"{settings['threads'] or 'default'} threads ({settings['texts_per_sec']:.1f} texts/s)")
+        return settings
+    
+    if not sweep and not force:
+        logger.info("🎛️  No tuned settings for this host and model, using config values "
+                    "(tune with `python -m src.sentiment.autotune`)")
+        return None
+    
+    import torch
+    
+    if texts is None:
+        from src.sentiment.benchmark import synthetic_texts, TEXT_LENGTHS
+        texts = synthetic_texts(max(batch_sizes) * 4, TEXT_LENGTHS['short'])
+    texts = [str(t) for t in texts if t]
+    
+    if analyzer.backend != 'pytorch':
+        thread_counts = [None]  # ONNX Runtime sizes its own thread pool
+    elif thread_counts is None:
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        thread_counts = sorted({1, max(1, cores // 2), cores})
+    
+    original_threads = torch.get_num_threads()
+    # Calibration texts are not real traffic: keep them out of truncation_stats()
+    original_counts = analyzer.tokenized_count, analyzer.truncated_count
+    logger.info(f"🎛️  Auto-tuning {len(batch_sizes)} batch sizes x {len(thread_counts)} thread counts "
+                f"on {len(texts)} texts (p95 budget {latency_budget_ms}ms)...")
+    
+    cases = []
+    try:
+        for threads in thread_counts:
+            if threads:
+                torch.set_num_threads(threads)
+            for batch_size in batch_sizes:
+                try:
+                    analyzer._token_probs(analyzer._encode(texts[:batch_size]))  # Warm kernels for this shape
+                    texts_per_sec, p95_ms = _sweep_case(analyzer, texts, batch_size)
+                except Exception as e:
+                    logger.warning(f"⚠️  bs={batch_size} threads={threads or '-'} failed, skipping: {e}")
+                    continue
+                cases.append({
+                    'batch_size': batch_size,
+                    'threads': threads,
+                    'texts_per_sec': texts_per_sec,
+                    'p95_batch_ms': p95_ms
+                })
+                logger.info(f"  bs={batch_size:<3} threads={threads or '-':<3} "
+                            f"{texts_per_sec:>8.1f} texts/s  p95 {p95_ms:.1f}ms")
+    finally:
+        torch.set_num_threads(original_threads)
+    
+    if not cases:
+        analyzer.tokenized_count, analyzer.truncated_count = original_counts
+        raise RuntimeError("every autotune setting failed")
+    
+    within = [case for case in cases if case['p95_batch_ms'] <= latency_budget_ms]
+    if within:
+        best = max(within, key=lambda case: case['texts_per_sec'])
+    else:
+        logger.warning("⚠️  No setting meets the latency budget, taking the fastest batches")
+        best = min(cases, key=lambda case: case['p95_batch_ms'])
+    
+    # Length-bucketed batching is budgeted in tokens: size it so a bucket
+    # of typical texts holds about the tuned batch size
+    lengths = [len(ids) for ids in analyzer._encode(texts)]
+    analyzer.tokenized_count, analyzer.truncated_count = original_counts
+    settings = dict(
+        best,
+        max_batch_tokens=int(best['batch_size'] * np.median(lengths)),
+        latency_budget_ms=latency_budget_ms,
+        model_id=analyzer.model_id,
+        host=_host_fingerprint(),
+        tuned_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        sweep=cases
+    )
+    
+    # Re-read so settings saved meanwhile by other processes are kept
+    tuned = _load(path)
+    tuned[key] = settings
+    _save(path, tuned)
+    
+    apply_settings(analyzer, settings)
+    logger.info(f"✅ Tuned: batch {settings['batch_size']}, {settings['threads'] or 'default'} threads, "
+                f"{settings['texts_per_sec']:.1f} texts/s (saved to {path})")
+    return settings
+
+if __name__ == '__main__':
+    import argparse
+    from src.sentiment.hf_sentiment_analyzer import HuggingFaceSentimentAnalyzer
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Tune HF sentiment batch size and threads for this host")
+    parser.add_argument('--model', default=None)
+    parser.add_argument('--latency-ms', type=float, default=None)
+    parser.add_argument('--force', action='store_true', help="sweep even if settings are cached")
+    args = parser.parse_args()
+    
+    config.HF_AUTOTUNE = False  # Tune explicitly below, not in the constructor
+    analyzer = HuggingFaceSentimentAnalyzer(args.model, num_workers=1)
+    settings = autotune(analyzer, latency_budget_ms=args.latency_ms, force=args.force, sweep=True)
+    print(json.dumps({k: v for k, v in settings.items() if k != 'sweep'}, indent=2))
@@ -0,0 +1,264 @@
+"""
+Offline throughput / latency benchmark for the sentiment engines
+
+Runs fully offline: a tiny BERT classifier and word-level tokenizer are
+generated locally, and the input is synthetic financial text. Each case
+(engine x batch size x text length x torch threads x cache mode) runs in
+a fresh process so peak RSS and thread settings are isolated. Results are
+written as JSON that can be diffed between releases.
+"""
+import json
+import os
+import platform
+import random
+import sys
+import time
+import logging
+import multiprocessing
+import numpy as np
+from config import config
+
+logger = logging.getLogger(__name__)
+
+VOCAB = (
+    "stock stocks shares market markets company earnings revenue profit loss growth "
+    "record quarter guidance outlook analysts investors traders rally selloff surge "
+    "plunge rise rises fall falls beat miss upgrade downgrade strong weak bullish "
+    "bearish dividend merger acquisition bankruptcy inflation rates fed demand supply "
+    "the a of to in on and for is are by with as after amid despite than this its"
+).split()
+
+TEXT_LENGTHS = {'short': 12, 'medium': 40, 'long': 160}  # words per text
+
+def synthetic_texts(n, words, seed=None):
+    """Random financial-sounding texts of roughly `words` words"""
+    if seed is None:
+        seed = config.RANDOM_STATE
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choices(VOCAB, k=max(1, int(rng.gauss(words, words * 0.25)))))
+        for _ in range(n)
+    ]
+
+def build_tiny_model(path=None):
+    """
+    Generate a tiny, randomly initialized sentiment classifier on disk
+    
+    Same architecture family and label set as the production model, small
+    enough to benchmark the surrounding code rather than the weights.
+    """
+    if path is None:
+        path = config.CACHE_DIR / "bench_tiny_model"
+    if (path / "config.json").exists():
+        return path
+    
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast, BertConfig, BertForSequenceClassification
+    
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]"]
+    vocab = {word: i for i, word in enumerate(specials + sorted(set(VOCAB)))}
+    
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    backend.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])]
+    )
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, unk_token="[UNK]", pad_token="[PAD]",
+        cls_token="[CLS]", sep_token="[SEP]", model_max_length=512
+    )
+    
+    model_config = BertConfig(
+        vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=128, max_position_embeddings=512, num_labels=3,
+        id2label={0: 'negative', 1: 'neutral', 2: 'positive'},
+        label2id={'negative': 0, 'neutral': 1, 'positive': 2}
+    )
+    torch.manual_seed(config.RANDOM_STATE)
+    model = BertForSequenceClassification(model_config)
+    
+    path.mkdir(parents=True, exist_ok=True)
+    model.save_pretrained(str(path))
+    tokenizer.save_pretrained(str(path))
+    logger.info(f"🔧 Built tiny benchmark model at {path}")
+    return path
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    # VmHWM belongs to this address space; ru_maxrss on Linux survives
+    # exec and would report the parent's peak for spawned workers
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def _latency_summary(latencies, texts):
+    latencies = np.asarray(latencies)
+    total = latencies.sum()
+    return {
+        'calls': len(latencies),
+        'texts_per_sec': texts / total if total else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000)
+    }
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+def _run_case(case):
+    """Run one benchmark case (in its own process)"""
+    import pandas as pd
+    from pathlib import Path
+    
+    # Isolate the sentiment cache per case so 'off' and 'warm' are honest
+    config.USE_CACHE = case['cache'] != 'off'
+    config.SENTIMENT_CACHE_PATH = Path(case['cache_path'])
+    config.SENTIMENT_DEDUPE = False
+    config.HF_NUM_WORKERS = 1
+    config.HF_TOKEN_CACHE = False
+    config.HF_AUTOTUNE = False  # Each case sets its own batch size and threads
+    logging.disable(logging.INFO)
+    
+    texts = synthetic_texts(case['texts'], TEXT_LENGTHS[case['length']])
+    single_texts = texts[:case['single_calls']]
+    batch_size = case['batch_size']
+    batches = [texts[i:i+batch_size] for i in range(0, len(texts), batch_size)]
+    
+    if case['engine'] == 'huggingface':
+        import torch
+        torch.set_num_threads(case['threads'])
+        from src.sentiment.hf_sentiment_analyzer import HuggingFaceSentimentAnalyzer
+        analyzer = HuggingFaceSentimentAnalyzer(case['model'])
+        batch_fn = lambda batch: analyzer.score_batch(batch, batch_size=batch_size)
+    else:
+        from src.sentiment.vader_analyzer import VADERSentimentAnalyzer
+        analyzer = VADERSentimentAnalyzer()
+        batch_fn = lambda batch: analyzer.score_batch(batch, workers=1)
+    
+    if case['cache'] == 'warm':
+        analyzer.analyze_dataframe(pd.DataFrame({'text': texts}), text_column='text')
+    
+    # Throw-away call so lazy init is not timed
+    analyzer.analyze(texts[0])
+    
+    results = {
+        'analyze': _latency_summary(
+            [_timed(analyzer.analyze, text) for text in single_texts], len(single_texts)
+        ),
+        'analyze_batch': _latency_summary(
+            [_timed(batch_fn, batch) for batch in batches], len(texts)
+        ),
+        'analyze_dataframe': _latency_summary(
+            [_timed(analyzer.analyze_dataframe, pd.DataFrame({'text': texts}), text_column='text')
+             for _ in range(case['dataframe_repeats'])],
+            len(texts) * case['dataframe_repeats']
+        )
+    }
+    
+    return {'case': {k: v for k, v in case.items() if k not in ('cache_path', 'model')},
+            'results': results,
+            'peak_rss_mb': _peak_rss_mb()}
+
+def _host_info():
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+    for package in ('torch', 'transformers', 'vaderSentiment', 'numpy', 'pandas'):
+        try:
+            from importlib import metadata
+            info[package] = metadata.version(package)
+        except Exception:
+            info[package] = None
+    return info
+
+def run_benchmark(engines=('vader', 'huggingface'), batch_sizes=(8, 32), lengths=('short', 'long'),
+                  threads=(1, None), cache_modes=('off', 'warm'), texts=512, single_calls=100,
+                  dataframe_repeats=3, output_path=None):
+    """
+    Sweep the sentiment engines and write a JSON report
+    
+    Args:
+        threads: torch thread counts to try; None means all cores
+        cache_modes: 'off' (no sentiment cache) and/or 'warm' (cache
+            populated before timing)
+    
+    Returns:
+        dict: the report that was written
+    """
+    if output_path is None:
+        output_path = config.LOGS_DIR / f"sentiment_benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    
+    model_path = build_tiny_model() if 'huggingface' in engines else None
+    bench_dir = config.CACHE_DIR / "bench"
+    bench_dir.mkdir(parents=True, exist_ok=True)
+    
+    cases = []
+    for engine in engines:
+        # VADER has no batch or thread knobs worth sweeping
+        engine_batches = batch_sizes if engine == 'huggingface' else batch_sizes[:1]
+        engine_threads = threads if engine == 'huggingface' else (1,)
+        # ...nor a sentiment cache
+        engine_caches = cache_modes if engine == 'huggingface' else cache_modes[:1]
+        for length in lengths:
+            for batch_size in engine_batches:
+                for thread_count in engine_threads:
+                    for cache in engine_caches:
+                        n = len(cases)
+                        cases.append({
+                            'engine': engine,
+                            'length': length,
+                            'batch_size': batch_size,
+                            'threads': thread_count or os.cpu_count(),
+                            'cache': cache,
+                            'texts': texts,
+                            'single_calls': single_calls,
+                            'dataframe_repeats': dataframe_repeats,
+                            'model': str(model_path) if model_path else None,
+                            'cache_path': str(bench_dir / f"cache_{os.getpid()}_{n}.sqlite")
+                        })
+    
+    logger.info(f"📊 Running {len(cases)} benchmark cases...")
+    
+    runs = []
+    context = multiprocessing.get_context('spawn')
+    for case in cases:
+        with context.Pool(1) as pool:
+            run = pool.apply(_run_case, (case,))
+        runs.append(run)
+        
+        batch = run['results']['analyze_batch']
+        logger.info(f"{case['engine']:>11} {case['length']:>6} bs={case['batch_size']:<3} "
+                    f"threads={case['threads']:<2} cache={case['cache']:<4} "
+                    f"{batch['texts_per_sec']:>9.1f} texts/s  p99 {batch['p99_ms']:.1f}ms  "
+                    f"rss {run['peak_rss_mb']:.0f}MB")
+        
+        for suffix in ('', '-wal', '-shm'):
+            cache_file = case['cache_path'] + suffix
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+    
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': _host_info(),
+        'runs': runs
+    }
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, indent=2))
+    logger.info(f"💾 Benchmark report saved to {output_path}")
+    
+    return report
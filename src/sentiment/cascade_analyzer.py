@@ -0,0 +1,139 @@
+"""
+Confidence-gated VADER -> transformer cascade
+
+Everything is scored with VADER first. Only texts whose VADER compound
+falls inside the ambiguity band (|compound| < CASCADE_AMBIGUITY_BAND) are
+sent, in batches, to the Hugging Face model. Clear-cut texts keep their
+VADER score, so transformer cost is paid only where it changes answers.
+Texts whose Hugging Face batch fails keep their VADER score as well.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from config import config
+from src.sentiment.sentiment_factor import get_sentiment_analyzer
+from src.sentiment.text_normalizer import dedupe_texts
+from src.sentiment.streaming import iter_sentiment
+
+logger = logging.getLogger(__name__)
+
+class CascadeSentimentAnalyzer:
+    """
+    VADER first, Hugging Face for ambiguous texts only
+    """
+    
+    def __init__(self, band=None):
+        if band is None:
+            band = config.CASCADE_AMBIGUITY_BAND
+        
+        logger.info(f"Creating cascade sentiment analyzer (ambiguity band ±{band})")
+        
+        self.band = band
+        self.vader = get_sentiment_analyzer('vader')
+        self._hf = None
+        self.total_count = 0
+        self.escalated_count = 0
+    
+    @property
+    def hf(self):
+        """Hugging Face analyzer, loaded on the first ambiguous text"""
+        if self._hf is None:
+            self._hf = get_sentiment_analyzer('huggingface')
+        return self._hf
+    
+    def _is_ambiguous(self, compound):
+        return abs(compound) < self.band
+    
+    def analyze(self, text, use_cache=True):
+        """
+        Analyze single text
+        
+        Returns:
+            dict: {'label', 'score', 'compound', 'engine'}
+        """
+        result = self.vader.analyze(text, use_cache=use_cache)
+        engine = 'vader'
+        
+        if text and not pd.isna(text) and self._is_ambiguous(result['compound']):
+            hf_batch, ok = self.hf._score([text], use_cache=use_cache)
+            if ok[0]:
+                result = hf_batch.to_records()[0]
+                engine = 'huggingface'
+            self.escalated_count += 1
+        self.total_count += 1
+        
+        return dict(result, engine=engine)
+    
+    def score_batch(self, texts, use_cache=True):
+        """Score many texts into a SentimentBatch"""
+        return self._score(texts, use_cache=use_cache)[0]
+    
+    def _score(self, texts, use_cache=True):
+        """
+        Returns:
+            tuple: (SentimentBatch, bool array marking texts scored by
+            Hugging Face; escalated texts whose batch failed keep their
+            VADER score and are not marked)
+        """
+        texts = list(texts)
+        batch = self.vader.score_batch(texts, use_cache=use_cache)
+        
+        has_text = np.array([bool(text) and not pd.isna(text) and bool(str(text).strip()) for text in texts],
+                            dtype=bool)
+        indices = np.flatnonzero(has_text & (np.abs(batch.compound) < self.band))
+        by_hf = np.zeros(len(texts), dtype=bool)
+        
+        if len(indices):
+            hf_batch, ok = self.hf._score([texts[i] for i in indices], use_cache=use_cache)
+            batch.put(indices[ok], hf_batch.take(np.flatnonzero(ok)))
+            by_hf[indices[ok]] = True
+            if not ok.all():
+                logger.warning(f"⚠️  Cascade: {int((~ok).sum())}/{len(indices)} escalated texts keep their "
+                               f"VADER score after failed Hugging Face batches")
+        
+        self.total_count += len(texts)
+        self.escalated_count += len(indices)
+        
+        return batch, by_hf
+    
+    def analyze_dataframe(self, df, text_column=None, dedupe=None):
+        """
+        Add sentiment columns plus 'sentiment_engine' (vader/huggingface)
+        """
+        if text_column is None:
+            text_column = config.SENTIMENT_TEXT_COLUMN
+        if dedupe is None:
+            dedupe = config.SENTIMENT_DEDUPE
+        
+        logger.info(f"Cascade: analyzing sentiment for {len(df)} records")
+        
+        texts = df[text_column].tolist()
+        if dedupe:
+            uniques, codes, self.last_dedup_ratio = dedupe_texts(texts)
+            batch, by_hf = self._score(uniques)
+            batch, by_hf = batch.take(codes), by_hf[codes]
+        else:
+            batch, by_hf = self._score(texts)
+        
+        batch.assign(df)
+        df['sentiment_engine'] = np.where(by_hf, 'huggingface', 'vader')
+        
+        count = int(by_hf.sum())
+        share = count / len(df) * 100 if len(df) else 0.0
+        logger.info(f"Cascade: {count}/{len(df)} records ({share:.1f}%) sent to Hugging Face")
+        logger.info(f"Distribution: {df['sentiment_label'].value_counts().to_dict()}")
+        
+        return df
+    
+    def stats(self):
+        """Traffic split between the cheap and the expensive engine"""
+        return {
+            'band': self.band,
+            'total': self.total_count,
+            'escalated': self.escalated_count,
+            'escalated_pct': self.escalated_count / self.total_count * 100 if self.total_count else 0.0
+        }
+    
+    def analyze_stream(self, source, text_column=None, chunk_size=None):
+        """Score an iterable of texts or DataFrame chunks, yielding scored chunks"""
+        return iter_sentiment(self, source, text_column=text_column, chunk_size=chunk_size)
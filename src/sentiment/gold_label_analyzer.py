@@ -0,0 +1,116 @@
+"""
+Gold-label passthrough "analyzer" for training runs
+
+Datasets such as twitter-financial-news-sentiment already carry a human
+label, which create_stock_news_dataset copies into 'news_sentiment'.
+This mode maps those labels straight onto the sentiment columns with one
+vectorized column operation. Only rows without a usable label are sent
+to a fallback model.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from config import config
+from src.sentiment.sentiment_batch import SentimentBatch
+from src.sentiment.sentiment_factor import get_sentiment_analyzer
+from src.sentiment.streaming import iter_sentiment
+
+logger = logging.getLogger(__name__)
+
+# Gold label -> label code (= compound); a human label is treated as fully confident
+GOLD_CODES = {'negative': -1, 'neutral': 0, 'positive': 1}
+
+class GoldLabelSentimentAnalyzer:
+    """
+    Use the dataset's own labels, falling back to a model where missing
+    """
+    
+    def __init__(self, label_column=None, fallback_mode=None):
+        if label_column is None:
+            label_column = config.GOLD_LABEL_COLUMN
+        if fallback_mode is None:
+            fallback_mode = config.GOLD_FALLBACK_MODE
+        
+        logger.info(f"Creating gold-label sentiment passthrough ('{label_column}', fallback: {fallback_mode})")
+        
+        self.label_column = label_column
+        self.fallback_mode = fallback_mode
+        self._fallback = None
+        self.total_count = 0
+        self.fallback_count = 0
+    
+    @property
+    def fallback(self):
+        """Model for rows without a gold label, loaded on first need"""
+        if self._fallback is None:
+            self._fallback = get_sentiment_analyzer(self.fallback_mode)
+        return self._fallback
+    
+    def analyze(self, text, use_cache=True):
+        """Analyze single text (no gold label here, so always the fallback model)"""
+        self.total_count += 1
+        self.fallback_count += 1
+        return self.fallback.analyze(text, use_cache=use_cache)
+    
+    def score_batch(self, texts, use_cache=True):
+        """Texts alone carry no gold label: score them all with the fallback"""
+        self.total_count += len(texts)
+        self.fallback_count += len(texts)
+        return self.fallback.score_batch(texts, use_cache=use_cache)
+    
+    def score_labels(self, labels, texts):
+        """
+        SentimentBatch from gold labels, scoring unlabeled texts with the fallback
+        
+        Returns:
+            tuple: (SentimentBatch, number of texts sent to the fallback)
+        """
+        codes = pd.Series(labels, dtype='string').str.strip().str.lower().map(GOLD_CODES)
+        missing = codes.isna().to_numpy()
+        codes = codes.fillna(0).to_numpy(dtype=np.int8)
+        
+        batch = SentimentBatch(codes, np.ones(len(codes)), codes)
+        
+        fallback = np.flatnonzero(missing)
+        if len(fallback):
+            batch.put(fallback, self.fallback.score_batch([texts[i] for i in fallback]))
+        
+        self.total_count += len(codes)
+        self.fallback_count += len(fallback)
+        
+        return batch, len(fallback)
+    
+    def analyze_dataframe(self, df, text_column=None):
+        """Copy gold labels into the sentiment columns; score unlabeled rows with the fallback"""
+        if text_column is None:
+            text_column = config.SENTIMENT_TEXT_COLUMN
+        
+        logger.info(f"Gold labels: mapping sentiment for {len(df)} records")
+        
+        if self.label_column in df.columns:
+            labels = df[self.label_column]
+        else:
+            logger.warning(f"'{self.label_column}' column not found, scoring every row with {self.fallback_mode}")
+            labels = [None] * len(df)
+        
+        batch, fallback_rows = self.score_labels(labels, df[text_column].tolist())
+        batch.assign(df)
+        
+        logger.info(f"Gold labels: {len(df) - fallback_rows}/{len(df)} records labelled, "
+                    f"{fallback_rows} scored with {self.fallback_mode}")
+        logger.info(f"Distribution: {df['sentiment_label'].value_counts().to_dict()}")
+        
+        return df
+    
+    def stats(self):
+        """How many records needed the fallback model"""
+        return {
+            'label_column': self.label_column,
+            'fallback_mode': self.fallback_mode,
+            'total': self.total_count,
+            'fallback': self.fallback_count
+        }
+    
+    def analyze_stream(self, source, text_column=None, chunk_size=None):
+        """Score an iterable of texts or DataFrame chunks, yielding scored chunks"""
+        return iter_sentiment(self, source, text_column=text_column, chunk_size=chunk_size)
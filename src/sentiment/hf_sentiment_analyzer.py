@@ -1,167 +1,734 @@
 """
 Sentiment analysis using Hugging Face pre-trained models
 """
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from transformers import pipeline, AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
 import torch
+import json
+import numpy as np
 import pandas as pd
 import logging
+import time
 from config import config
+from src.sentiment.sentiment_batch import SentimentBatch, label_code
+from src.sentiment.sentiment_cache import get_sentiment_cache
+from src.sentiment.snapshot import has_snapshot, load_snapshot, snapshot_dir
+from src.sentiment.streaming import iter_sentiment
+from src.sentiment.text_normalizer import dedupe_texts
 
 logger = logging.getLogger(__name__)
 
+ANALYZER_TYPE = 'huggingface'
+
+# Lower = attention pooling follows the most confident window more closely
+WINDOW_ATTENTION_TEMPERATURE = 0.1
+
+def load_pipeline(model_name, backend='pytorch', onnx_quantize=None, device=-1):
+    """
+    Build the sentiment pipeline for a model and backend
+    
+    Returns:
+        tuple: (pipeline, revision for cache keys, device description)
+    """
+    device_name = 'GPU' if device == 0 else 'CPU'
+    
+    if backend == 'onnx':
+        from src.sentiment.onnx_backend import OnnxSentimentPipeline
+        
+        sentiment_pipeline = OnnxSentimentPipeline(model_name, quantize=onnx_quantize)
+        # Exported graphs score slightly differently from the eager model
+        revision = f"{sentiment_pipeline.revision}+onnx{'-int8' if sentiment_pipeline.quantized else ''}"
+        return sentiment_pipeline, revision, 'CPU (ONNX Runtime)'
+    
+    if config.HF_USE_SNAPSHOT and has_snapshot(model_name):
+        # Local files only, weights memory-mapped from safetensors
+        sentiment_pipeline, revision = load_snapshot(model_name, device=device)
+        return sentiment_pipeline, revision, device_name + ' (local snapshot)'
+    
+    sentiment_pipeline = pipeline(
+        "sentiment-analysis",
+        model=model_name,
+        device=device,
+        cache_dir=str(config.HF_CACHE_DIR)
+    )
+    revision = getattr(sentiment_pipeline.model.config, '_commit_hash', None) or 'local'
+    return sentiment_pipeline, revision, device_name
+
+def load_model_info(model_name, backend='pytorch', onnx_quantize=None):
+    """
+    Tokenizer, model config and revision from the same source as
+    load_pipeline, without loading the weights
+    
+    Enough for a process whose inference runs in HFWorkerPool workers to
+    tokenize, batch and key the cache.
+    
+    Returns:
+        tuple: (tokenizer, model config, revision for cache keys)
+    """
+    revision = None
+    if backend == 'onnx':
+        from src.sentiment.onnx_backend import export_onnx
+        
+        if onnx_quantize is None:
+            onnx_quantize = config.HF_ONNX_QUANTIZE
+        # Exports once here, before the workers would race to do it
+        model_dir = export_onnx(model_name, quantize=onnx_quantize).parent
+        meta = json.loads((model_dir / "export_meta.json").read_text())
+        revision = f"{meta['revision']}+onnx{'-int8' if onnx_quantize else ''}"
+        source, kwargs = str(model_dir), {}
+    elif config.HF_USE_SNAPSHOT and has_snapshot(model_name):
+        model_dir = snapshot_dir(model_name)
+        revision = json.loads((model_dir / "snapshot_meta.json").read_text())['revision']
+        source, kwargs = str(model_dir), {'local_files_only': True}
+    else:
+        source, kwargs = model_name, {'cache_dir': str(config.HF_CACHE_DIR)}
+    
+    tokenizer = AutoTokenizer.from_pretrained(source, **kwargs)
+    model_config = AutoConfig.from_pretrained(source, **kwargs)
+    if revision is None:
+        revision = getattr(model_config, '_commit_hash', None) or 'local'
+    return tokenizer, model_config, revision
+
+def pipeline_probs(sentiment_pipeline, backend, token_ids):
+    """Class probabilities (NumPy, rows x classes) for pre-tokenized ids"""
+    if backend == 'onnx':
+        return sentiment_pipeline.predict_ids(token_ids)
+    
+    encoded = sentiment_pipeline.tokenizer.pad({'input_ids': token_ids}, return_tensors='pt')
+    model = sentiment_pipeline.model
+    
+    with torch.no_grad():
+        logits = model(**{k: v.to(model.device) for k, v in encoded.items()}).logits
+    
+    return torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+def pipeline_weight_bytes(sentiment_pipeline, backend):
+    """
+    Bytes held by one copy of a pipeline's weights: parameters and
+    buffers for PyTorch, the graph file for ONNX Runtime
+    """
+    if backend == 'onnx':
+        return sentiment_pipeline.model_path.stat().st_size
+    
+    model = sentiment_pipeline.model
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+def _pool_windows(probs, owners, n, pooling):
+    """
+    Pool per-window class probabilities into one row per text
+    
+    Args:
+        probs: windows x classes probabilities
+        owners: text index per window
+        n: number of texts
+        pooling: 'mean', 'max' or 'attention'
+    """
+    pooled = np.zeros((n, probs.shape[1]), dtype=np.float64)
+    
+    if pooling == 'max':
+        np.maximum.at(pooled, owners, probs)
+        return pooled / pooled.sum(axis=1, keepdims=True)
+    
+    if pooling == 'attention':
+        # Softmax over each text's windows of their confidence (max class prob)
+        confidence = probs.max(axis=1) / WINDOW_ATTENTION_TEMPERATURE
+        peak = np.full(n, -np.inf)
+        np.maximum.at(peak, owners, confidence)
+        weights = np.exp(confidence - peak[owners])
+    else:
+        weights = np.ones(len(probs))
+    
+    totals = np.zeros(n)
+    np.add.at(totals, owners, weights)
+    np.add.at(pooled, owners, probs * weights[:, None])
+    return pooled / totals[:, None]
+
 class HuggingFaceSentimentAnalyzer:
     """
     Sentiment analysis using Hugging Face transformers
     """
     
-    def __init__(self, model_name=None):
+    def __init__(self, model_name=None, backend=None, onnx_quantize=None, max_seq_len=None,
+                 num_workers=None):
+        """
+        Args:
+            model_name: HF model id or local path (default from config)
+            backend: 'pytorch' (transformers pipeline) or 'onnx'
+                (ONNX Runtime export); default from config
+            onnx_quantize: Use the dynamic int8 ONNX model (default from config)
+            max_seq_len: Tokens kept per text, including special tokens
+                (default from config, capped at the model's limit)
+            num_workers: Inference processes; above 1, batches are sharded
+                across a pinned HFWorkerPool (default from config)
+        """
         if model_name is None:
             model_name = config.HF_SENTIMENT_MODEL
+        if backend is None:
+            backend = config.HF_BACKEND
+        if max_seq_len is None:
+            max_seq_len = config.HF_MAX_SEQ_LEN
+        if num_workers is None:
+            num_workers = config.HF_NUM_WORKERS
         
         self.model_name = model_name
+        self.backend = backend
         
         logger.info(f"🤖 Loading {model_name} from Hugging Face...")
         logger.info("⏱️  First time: ~1-2 minutes download, then cached")
         
         # Determine device
         device = 0 if torch.cuda.is_available() else -1
-        device_name = 'GPU' if device == 0 else 'CPU'
         
         # Load pipeline
+        load_start = time.perf_counter()
         try:
-            self.pipeline = pipeline(
-                "sentiment-analysis",
-                model=model_name,
-                device=device,
-                cache_dir=str(config.HF_CACHE_DIR)
-            )
+            if num_workers > 1:
+                # Workers hold the model; this process only tokenizes and batches
+                self.pipeline = None
+                self.tokenizer, self.model_config, revision = load_model_info(model_name, backend, onnx_quantize)
+                self.load_seconds = time.perf_counter() - load_start
+                logger.info(f"✅ Tokenizer loaded in {self.load_seconds:.2f}s, "
+                            f"inference runs in {num_workers} worker processes")
+            else:
+                self.pipeline, revision, device_name = load_pipeline(model_name, backend, onnx_quantize, device)
+                self.tokenizer = self.pipeline.tokenizer
+                self.model_config = self.pipeline.model.config
+                self.load_seconds = time.perf_counter() - load_start
+                logger.info(f"✅ Model loaded on {device_name} in {self.load_seconds:.2f}s")
+            if backend == 'onnx':
+                device = -1
+            
+            # Truncate in tokens, never past what the model can embed
+            self.max_seq_len = min(max_seq_len, self.tokenizer.model_max_length)
+            self.truncated_count = 0
+            self.tokenized_count = 0
+            self.window_capped_count = 0  # score_long texts longer than max_windows windows
+            self.windowed_count = 0
+            
+            # Cache entries are tied to the exact checkpoint revision and
+            # truncation length, since both change the scores
+            self.model_id = f"{model_name}@{revision}:{self.max_seq_len}"
+            self.cache = get_sentiment_cache()
             
-            logger.info(f"✅ Model loaded on {device_name}")
+            self.token_cache = None
+            # Per-instance so the auto-tuner can adjust them
+            self.batch_size = config.BATCH_SIZE
+            self.max_batch_tokens = config.HF_MAX_BATCH_TOKENS
+            self.worker_pool = None
+            if num_workers > 1:
+                from src.sentiment.hf_worker_pool import HFWorkerPool
+                
+                self.worker_pool = HFWorkerPool(
+                    model_name,
+                    num_workers=num_workers,
+                    backend=backend,
+                    onnx_quantize=onnx_quantize
+                )
+            
+            # Workers pin their own threads; only in-process inference is tuned
+            if config.HF_AUTOTUNE and self.worker_pool is None:
+                from src.sentiment.autotune import autotune
+                
+                try:
+                    autotune(self)
+                except Exception as e:
+                    logger.warning(f"⚠️  Could not apply tuned settings, using config values: {e}")
             
             if device == -1:
                 logger.info("💡 Running on CPU - expect ~0.5-1s per text")
             else:
                 logger.info("⚡ Running on GPU - expect ~0.05-0.1s per text")
-                
+        
         except Exception as e:
             logger.error(f"❌ Error loading model: {e}")
             raise
     
-    def analyze(self, text):
+    def analyze(self, text, use_cache=True):
         """
         Analyze sentiment of single text
         
+        Args:
+            use_cache: Read and write the sentiment cache (off for warmup)
+        
         Returns:
             dict: {'label': str, 'score': float, 'compound': float}
         """
         if not text or pd.isna(text):
             return {'label': 'neutral', 'score': 0.0, 'compound': 0.0}
         
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(text, ANALYZER_TYPE, self.model_id)
+            if cached is not None:
+                return cached
+        
         try:
-            # Truncate to model's max length
-            text = str(text)[:512]
-            
-            result = self.pipeline(text)[0]
-            
-            label = result['label'].lower()
-            score = result['score']
+            probs = next(self._batch_probs([self._encode([str(text)])]))
+            if probs is None:
+                raise RuntimeError("inference failed")
+            result = self._batch_from_probs(probs).to_records()[0]
             
-            # Convert to compound score (-1 to 1)
-            if 'positive' in label:
-                compound = score
-                label = 'positive'
-            elif 'negative' in label:
-                compound = -score
-                label = 'negative'
-            else:
-                compound = 0.0
-                label = 'neutral'
-            
-            return {
-                'label': label,
-                'score': score,
-                'compound': compound
-            }
+            if cache is not None:
+                cache.put(text, result, ANALYZER_TYPE, self.model_id)
             
+            return result
+        
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
             return {'label': 'neutral', 'score': 0.0, 'compound': 0.0}
     
-    def analyze_batch(self, texts, batch_size=None):
+    def analyze_batch(self, texts, batch_size=None, batching=None, use_cache=True):
         """
         Analyze multiple texts efficiently
         
+        Returns one result dict per text; score_batch() returns arrays.
+        """
+        return self.score_batch(texts, batch_size=batch_size, batching=batching, use_cache=use_cache).to_records()
+    
+    def score_batch(self, texts, batch_size=None, batching=None, use_cache=True):
+        """
+        Score many texts into a SentimentBatch
+        
         Args:
             texts: List of texts
-            batch_size: Batch size (default from config)
+            batch_size: Texts per batch in 'fixed' mode (default: tuned or
+                from config); in 'length' mode an upper bound on rows per
+                batch (default: the token budget alone decides)
+            batching: 'fixed' or 'length' (default from config)
+            use_cache: Read and write the sentiment cache (off for warmup)
         """
-        if batch_size is None:
-            batch_size = config.BATCH_SIZE
+        return self._score(texts, batch_size=batch_size, batching=batching, use_cache=use_cache)[0]
+    
+    def _score(self, texts, batch_size=None, batching=None, use_cache=True):
+        """
+        Returns:
+            tuple: (SentimentBatch, bool array marking texts actually
+            scored, from the cache or the model; empty texts and texts in
+            failed batches are neutral and not marked)
+        """
+        texts = list(texts)
+        batch = SentimentBatch.neutral(len(texts))
+        scored_ok = np.zeros(len(texts), dtype=bool)
+        present = [i for i, text in enumerate(texts) if text and not pd.isna(text)]
+        
+        # Serve what we can from the cache, run the model only on misses
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = cache.get_many([texts[i] for i in present], ANALYZER_TYPE, self.model_id)
+            missing, hits, hit_results = [], [], []
+            for i, result in zip(present, cached):
+                if result is None:
+                    missing.append(i)
+                else:
+                    hits.append(i)
+                    hit_results.append(result)
+            if hits:
+                batch.put(hits, SentimentBatch.from_records(hit_results))
+                scored_ok[hits] = True
+            logger.info(f"Sentiment cache: {len(hits)} hits, {len(missing)} misses")
+        else:
+            missing = present
+        
+        missing_texts = [texts[i] for i in missing]
+        scored, ok = self._infer_batches(missing_texts, batch_size, batching)
+        
+        # Failed batches stay neutral and are never cached
+        fresh = np.flatnonzero(ok)
+        batch.put(np.asarray(missing, dtype=np.intp)[fresh], scored.take(fresh))
+        scored_ok[np.asarray(missing, dtype=np.intp)[fresh]] = True
+        
+        if cache is not None and len(fresh):
+            cache.put_many(
+                [missing_texts[i] for i in fresh],
+                scored.take(fresh).to_records(),
+                ANALYZER_TYPE,
+                self.model_id
+            )
+        
+        return batch, scored_ok
+    
+    def _infer_batches(self, texts, batch_size=None, batching=None):
+        """
+        Run the model over texts batch by batch
+        
+        Each text is tokenized once; in-process inference feeds those ids
+        straight to the model.
         
-        results = []
+        Args:
+            texts: List of non-empty texts
+            batch_size: Texts per batch in 'fixed' mode (default:
+                self.batch_size); row cap per batch in 'length' mode
+            batching: 'fixed' (input order) or 'length' (token-budget
+                buckets of similar length); default from config
+        
+        Returns:
+            tuple: (SentimentBatch in input order, bool array marking
+            texts whose batch succeeded)
+        """
+        if batching is None:
+            batching = config.HF_BATCHING
+        
+        texts = [str(text) if text and not pd.isna(text) else "" for text in texts]
         total = len(texts)
+        results = SentimentBatch.neutral(total)
+        ok = np.zeros(total, dtype=bool)
         
-        logger.info(f"Processing {total} texts in batches of {batch_size}...")
+        if not texts:
+            return results, ok
         
-        for i in range(0, total, batch_size):
-            batch = texts[i:i+batch_size]
-            
-            # Truncate texts
-            batch = [str(text)[:512] if text and not pd.isna(text) else "" for text in batch]
+        token_ids = self._token_ids(texts)
+        
+        if batching == 'length':
+            batches = self._length_batches([len(ids) for ids in token_ids], max_rows=batch_size)
+            cap = f", at most {batch_size} texts" if batch_size else ""
+            logger.info(f"Processing {total} texts in {len(batches)} length-bucketed batches "
+                        f"(budget {self.max_batch_tokens} tokens{cap})...")
+        else:
+            if batch_size is None:
+                batch_size = self.batch_size
+            batches = [list(range(i, min(i + batch_size, total))) for i in range(0, total, batch_size)]
+            logger.info(f"Processing {total} texts in batches of {batch_size}...")
+        
+        outputs = self._batch_probs([[token_ids[i] for i in indices] for indices in batches])
+        
+        processed = 0
+        for indices, probs in zip(batches, outputs):
+            # Failed batches stay neutral and are flagged not ok
+            if probs is not None:
+                results.put(indices, self._batch_from_probs(probs))
+                ok[indices] = True
             
+            # Progress
+            prev = processed
+            processed += len(indices)
+            if processed // 50 > prev // 50 or processed == total:
+                logger.info(f"Progress: {processed}/{total} ({processed/total*100:.1f}%)")
+        
+        return results, ok
+    
+    def _batch_probs(self, batches):
+        """
+        Class probabilities per batch of token ids, in order; None marks a
+        failed batch
+        
+        Batches go to the worker pool when there is one.
+        """
+        if self.worker_pool is not None:
+            yield from self.worker_pool.imap(batches)
+            return
+        
+        for token_ids in batches:
             try:
-                batch_results = self.pipeline(batch)
-                
-                for result in batch_results:
-                    label = result['label'].lower()
-                    score = result['score']
-                    
-                    if 'positive' in label:
-                        compound = score
-                        label = 'positive'
-                    elif 'negative' in label:
-                        compound = -score
-                        label = 'negative'
-                    else:
-                        compound = 0.0
-                        label = 'neutral'
-                    
-                    results.append({
-                        'label': label,
-                        'score': score,
-                        'compound': compound
-                    })
-                
-                # Progress
-                processed = min(i + batch_size, total)
-                if processed % 50 == 0 or processed == total:
-                    logger.info(f"Progress: {processed}/{total} ({processed/total*100:.1f}%)")
-                    
+                yield self._token_probs(token_ids)
             except Exception as e:
-                logger.error(f"Error processing batch {i}: {e}")
-                # Add neutral results for failed batch
-                results.extend([
-                    {'label': 'neutral', 'score': 0.0, 'compound': 0.0}
-                    for _ in batch
-                ])
+                logger.error(f"Error processing batch: {e}")
+                yield None
+    
+    def _token_probs(self, token_ids):
+        """Class probabilities (NumPy, rows x classes) for pre-tokenized ids, in-process"""
+        return pipeline_probs(self.pipeline, self.backend, token_ids)
+    
+    def _batch_from_probs(self, probs):
+        """Argmax class per row -> SentimentBatch"""
+        id2label = self.model_config.id2label
         
-        return results
+        # Label code per class id, then one gather for the whole batch
+        class_codes = np.array([label_code(id2label[i]) for i in range(len(id2label))], dtype=np.int8)
+        best = probs.argmax(axis=1)
+        codes = class_codes[best]
+        score = probs[np.arange(len(probs)), best]
+        return SentimentBatch(codes * score, score, codes)
     
-    def analyze_dataframe(self, df, text_column='news_text'):
+    def score_long(self, texts, pooling=None, overlap=None, max_windows=None):
+        """
+        Score long texts (full article bodies) over overlapping token windows
+        
+        Each text is split into windows of max_seq_len tokens that overlap
+        by `overlap` tokens. Windows from all texts are packed together
+        into length-bucketed batches, and their class probabilities are
+        pooled back per text. Texts that fit in one window score the same
+        as with score_batch.
+        
+        Args:
+            texts: List of texts
+            pooling: 'mean', 'max' (per-class max, renormalized) or
+                'attention' (windows weighted by softmax of their
+                confidence); default from config
+            overlap: Tokens shared by consecutive windows (default from config)
+            max_windows: Cap per text; longer texts keep evenly spaced
+                windows (default from config)
+        
+        Returns:
+            SentimentBatch
+        """
+        if pooling is None:
+            pooling = config.HF_WINDOW_POOLING
+        if overlap is None:
+            overlap = config.HF_WINDOW_OVERLAP
+        if max_windows is None:
+            max_windows = config.HF_MAX_WINDOWS
+        
+        texts = list(texts)
+        batch = SentimentBatch.neutral(len(texts))
+        present = [i for i, text in enumerate(texts) if text and not pd.isna(text) and str(text).strip()]
+        
+        # Window settings change the scores, so they are part of the cache key
+        model_id = f"{self.model_id}:win-{pooling}-{overlap}-{max_windows}"
+        if self.cache is not None:
+            cached = self.cache.get_many([texts[i] for i in present], ANALYZER_TYPE, model_id)
+            missing, hits, hit_results = [], [], []
+            for i, result in zip(present, cached):
+                if result is None:
+                    missing.append(i)
+                else:
+                    hits.append(i)
+                    hit_results.append(result)
+            if hits:
+                batch.put(hits, SentimentBatch.from_records(hit_results))
+        else:
+            missing = present
+        
+        if not missing:
+            return batch
+        
+        missing_texts = [str(texts[i]) for i in missing]
+        windows, owners = self._windows(missing_texts, overlap, max_windows)
+        logger.info(f"🪟 Scoring {len(missing_texts)} texts as {len(windows)} windows "
+                    f"({pooling} pooling)...")
+        
+        batches = self._length_batches([len(ids) for ids in windows])
+        outputs = self._batch_probs([[windows[i] for i in indices] for indices in batches])
+        probs = None
+        text_ok = np.ones(len(missing_texts), dtype=bool)
+        for indices, window_probs in zip(batches, outputs):
+            if window_probs is None:
+                # A text with any failed window stays neutral and is never cached
+                text_ok[owners[indices]] = False
+                continue
+            if probs is None:
+                probs = np.empty((len(windows), window_probs.shape[1]), dtype=np.float32)
+            probs[indices] = window_probs
+        
+        if not text_ok.all():
+            logger.warning(f"⚠️  {int((~text_ok).sum())}/{len(missing_texts)} texts left neutral after failed batches")
+        scored_texts = np.flatnonzero(text_ok)
+        if not len(scored_texts):
+            return batch
+        
+        # Pool the surviving texts' windows, renumbering those texts 0..k-1
+        window_ok = text_ok[owners]
+        renumbered = (np.cumsum(text_ok) - 1)[owners[window_ok]]
+        scored = self._batch_from_probs(_pool_windows(probs[window_ok], renumbered, len(scored_texts), pooling))
+        batch.put(np.asarray(missing, dtype=np.intp)[scored_texts], scored)
+        
+        if self.cache is not None:
+            self.cache.put_many([missing_texts[i] for i in scored_texts], scored.to_records(), ANALYZER_TYPE, model_id)
+        
+        return batch
+    
+    def _windows(self, texts, overlap, max_windows):
+        """
+        Split texts into overlapping token windows
+        
+        Uses the fast tokenizer's overflow support (stride = overlap), so
+        every window carries the model's special tokens.
+        
+        Returns:
+            tuple: (token id list per window; int array mapping each
+            window to its text)
+        """
+        tokenizer = self.tokenizer
+        
+        # Overlap must leave room for new tokens in each window
+        body = self.max_seq_len - len(tokenizer('')['input_ids'])
+        overlap = min(overlap, body // 2)
+        
+        encoded = tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.max_seq_len,
+            stride=overlap,
+            return_overflowing_tokens=True
+        )
+        all_windows = encoded['input_ids']
+        all_owners = np.asarray(encoded['overflow_to_sample_mapping'], dtype=np.intp)
+        
+        # Cap windows per text, keeping them evenly spread over the text
+        counts = np.bincount(all_owners, minlength=len(texts))
+        keep = []
+        offset = 0
+        for count in counts:
+            if count > max_windows:
+                keep.extend(offset + np.unique(np.linspace(0, count - 1, max_windows).round().astype(int)))
+            else:
+                keep.extend(range(offset, offset + count))
+            offset += count
+        
+        self.windowed_count += len(texts)
+        self.window_capped_count += int((counts > max_windows).sum())
+        
+        return [all_windows[i] for i in keep], all_owners[keep]
+    
+    def use_token_cache(self, texts):
+        """
+        Pre-tokenize a corpus once (Arrow cache on disk) and use its ids
+        for matching texts from now on
+        
+        Only applies to the in-process PyTorch backend.
+        """
+        if self.backend != 'pytorch' or self.worker_pool is not None:
+            logger.warning("Token cache needs the in-process PyTorch backend, skipping")
+            return None
+        
+        from src.sentiment.token_cache import build_token_cache
+        
+        self.token_cache = build_token_cache(texts, self)
+        return self.token_cache
+    
+    def _token_ids(self, texts):
+        """
+        Model-ready token ids per text
+        
+        Texts found in the token cache are not tokenized again; the rest
+        are tokenized once here.
+        """
+        token_ids = [None] * len(texts)
+        if self.token_cache is not None:
+            token_ids, truncated = self.token_cache.lookup(texts)
+            hits = [flag for flag in truncated if flag is not None]
+            self.tokenized_count += len(hits)
+            self.truncated_count += sum(hits)
+        
+        missing = [i for i, ids in enumerate(token_ids) if ids is None]
+        if missing:
+            for i, ids in zip(missing, self._encode([texts[i] for i in missing])):
+                token_ids[i] = ids
+        
+        return token_ids
+    
+    def weight_bytes(self):
+        """Bytes held by one copy of the model's weights"""
+        if self.worker_pool is not None:
+            return self.worker_pool.weight_bytes()
+        return pipeline_weight_bytes(self.pipeline, self.backend)
+    
+    def close(self):
+        """Stop inference worker processes, if any"""
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+    
+    def _encode(self, texts):
+        """
+        Tokenize texts once into ids truncated to max_seq_len, recording
+        how many were cut
+        
+        The fast tokenizer's overflow output gives both in one pass: the
+        first window of each text is exactly what the pipeline would feed
+        the model, and a second window means the text was truncated.
+        
+        Returns:
+            list: token id list per text
+        """
+        tokenizer = self.tokenizer
+        if tokenizer.is_fast:
+            encoded = tokenizer(texts, truncation=True, max_length=self.max_seq_len,
+                                return_overflowing_tokens=True)
+            owners = np.asarray(encoded['overflow_to_sample_mapping'], dtype=np.intp)
+            first = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]]) if len(owners) else owners
+            token_ids = [encoded['input_ids'][i] for i in first]
+            truncated = int((np.bincount(owners, minlength=len(texts)) > 1).sum())
+        else:
+            token_ids = tokenizer(texts, truncation=True, max_length=self.max_seq_len)['input_ids']
+            raw = tokenizer(texts, truncation=False)['input_ids']
+            truncated = sum(len(ids) > self.max_seq_len for ids in raw)
+        
+        self.tokenized_count += len(texts)
+        self.truncated_count += truncated
+        if truncated:
+            logger.info(f"✂️  Truncated {truncated}/{len(texts)} texts to {self.max_seq_len} tokens")
+        
+        return token_ids
+    
+    def truncation_stats(self):
+        """
+        How many inputs were cut to max_seq_len so far, and how many
+        score_long texts had windows dropped by the max_windows cap
+        """
+        return {
+            'max_seq_len': self.max_seq_len,
+            'tokenized': self.tokenized_count,
+            'truncated': self.truncated_count,
+            'truncated_pct': self.truncated_count / self.tokenized_count * 100 if self.tokenized_count else 0.0,
+            'windowed': self.windowed_count,
+            'window_capped': self.window_capped_count,
+            'window_capped_pct': self.window_capped_count / self.windowed_count * 100 if self.windowed_count else 0.0
+        }
+    
+    def _length_batches(self, lengths, max_rows=None):
+        """
+        Group text indices into batches of similar token length
+        
+        Texts are sorted by (truncated) token length and packed greedily
+        so that padded size (batch rows x longest row) stays within
+        max_batch_tokens (HF_MAX_BATCH_TOKENS unless auto-tuned). Short texts end up in large batches,
+        long ones in small batches, and little compute goes to padding.
+        max_rows, if given, also caps the texts per batch.
+        """
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        
+        budget = self.max_batch_tokens
+        batches = []
+        current = []
+        for i in order:
+            # Sorted ascending, so the new text is the longest in the batch
+            if current and ((len(current) + 1) * lengths[i] > budget or len(current) == max_rows):
+                batches.append(current)
+                current = []
+            current.append(i)
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def analyze_dataframe(self, df, text_column=None, dedupe=None, windowed=None):
         """
         Add sentiment analysis to entire dataframe
+        
+        With dedupe (default from config), texts are normalized and only
+        unique strings are scored; results are broadcast back to all rows.
+        With windowed (default from config), long texts are scored over
+        overlapping token windows (see score_long) instead of truncated.
         """
+        if text_column is None:
+            text_column = config.SENTIMENT_TEXT_COLUMN
+        if dedupe is None:
+            dedupe = config.SENTIMENT_DEDUPE
+        if windowed is None:
+            windowed = config.HF_SLIDING_WINDOW
+        
         logger.info(f"Analyzing sentiment for {len(df)} records...")
         
+        score = self.score_long if windowed else self.score_batch
         texts = df[text_column].fillna('').tolist()
-        results = self.analyze_batch(texts)
+        if dedupe:
+            uniques, codes, self.last_dedup_ratio = dedupe_texts(texts)
+            batch = score(uniques).take(codes)
+        else:
+            batch = score(texts)
         
         # Add to dataframe
-        df['sentiment_label'] = [r['label'] for r in results]
-        df['sentiment_score'] = [r['score'] for r in results]
-        df['sentiment_compound'] = [r['compound'] for r in results]
+        batch.assign(df)
         
         logger.info(f"✅ Sentiment analysis complete")
         logger.info(f"Distribution: {df['sentiment_label'].value_counts().to_dict()}")
         
         return df
+    
+    def analyze_stream(self, source, text_column=None, chunk_size=None):
+        """
+        Score an iterable of texts or DataFrame chunks lazily
+        
+        Yields scored DataFrame chunks; memory stays bounded by chunk size.
+        """
+        return iter_sentiment(self, source, text_column=text_column, chunk_size=chunk_size)
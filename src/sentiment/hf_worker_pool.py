@@ -0,0 +1,163 @@
+"""
+Process-sharded Hugging Face inference
+
+One transformers pipeline in one process stops scaling after a few cores
+because intra-op threading levels off. HFWorkerPool starts N processes,
+each loading the model once with torch pinned to its own share of the
+cores, and spreads batches across them. Results come back in order.
+The parent analyzer keeps only the tokenizer: it sends token ids and gets
+class probabilities back.
+"""
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Per-process state, set by _init_worker
+_worker_pipeline = None
+_worker_backend = None
+
+def _available_cores():
+    """Cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def _init_worker(slot_counter, threads, model_name, backend, onnx_quantize):
+    """
+    Pin this worker to its core share and load the model once
+    
+    Only the pipeline is loaded: no sentiment cache, auto-tuning or
+    nested pool, which stay with the parent analyzer.
+    """
+    global _worker_pipeline, _worker_backend
+    
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+    
+    cores = _available_cores()
+    share = cores[slot * threads:(slot + 1) * threads]
+    if share and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, share)
+    
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    
+    from src.sentiment.hf_sentiment_analyzer import load_pipeline
+    
+    device = 0 if torch.cuda.is_available() else -1
+    _worker_pipeline, _, _ = load_pipeline(model_name, backend, onnx_quantize, device)
+    _worker_backend = backend
+    
+    logger.info(f"Worker {slot} ready on cores {share} with {threads} threads")
+
+def _run_batch(token_ids):
+    """Class probabilities for one batch of token ids in a worker; None marks a failed batch"""
+    from src.sentiment.hf_sentiment_analyzer import pipeline_probs
+    
+    try:
+        return pipeline_probs(_worker_pipeline, _worker_backend, token_ids)
+    except Exception as e:
+        logger.error(f"Error processing batch in worker {os.getpid()}: {e}")
+        return None
+
+def _weight_bytes():
+    from src.sentiment.hf_sentiment_analyzer import pipeline_weight_bytes
+    
+    return pipeline_weight_bytes(_worker_pipeline, _worker_backend)
+
+class HFWorkerPool:
+    """
+    Pool of model-holding worker processes
+    """
+    
+    def __init__(self, model_name=None, num_workers=None, threads_per_worker=None,
+                 backend=None, onnx_quantize=None):
+        if model_name is None:
+            model_name = config.HF_SENTIMENT_MODEL
+        if num_workers is None:
+            num_workers = config.HF_NUM_WORKERS
+        if backend is None:
+            backend = config.HF_BACKEND
+        if threads_per_worker is None:
+            threads_per_worker = max(1, len(_available_cores()) // num_workers)
+        
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        
+        logger.info(f"🧵 Starting {num_workers} inference workers x {threads_per_worker} threads...")
+        
+        # spawn: forking a process that already holds torch threads can deadlock
+        context = multiprocessing.get_context('spawn')
+        slot_counter = context.Value('i', 0)
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(slot_counter, threads_per_worker, model_name, backend, onnx_quantize)
+        )
+    
+    def imap(self, batches):
+        """
+        Score batches of token ids across the workers
+        
+        Yields one class-probability array (or None on failure) per
+        batch, in input order.
+        """
+        futures = [self._executor.submit(_run_batch, batch) for batch in batches]
+        for future in futures:
+            yield future.result()
+    
+    def weight_bytes(self):
+        """Bytes held by one worker's copy of the model weights"""
+        return self._executor.submit(_weight_bytes).result()
+    
+    def close(self):
+        """Shut the workers down"""
+        self._executor.shutdown(wait=True)
+
+def benchmark_workers(texts, worker_counts=(1, 2, 4, 8), model_name=None):
+    """
+    Measure throughput by worker count on this host
+    
+    Returns:
+        list: {'workers', 'threads_per_worker', 'seconds', 'texts_per_sec'} per count
+    """
+    from src.sentiment.hf_sentiment_analyzer import HuggingFaceSentimentAnalyzer
+    
+    texts = [str(t) for t in texts if t]
+    report = []
+    
+    for workers in worker_counts:
+        analyzer = HuggingFaceSentimentAnalyzer(model_name, num_workers=workers)
+        if analyzer.worker_pool is not None:
+            threads = analyzer.worker_pool.threads_per_worker
+        else:
+            import torch
+            threads = torch.get_num_threads()
+        
+        try:
+            # Warm up so process start and model load are not timed
+            analyzer._infer_batches(texts[:config.BATCH_SIZE * workers], config.BATCH_SIZE)
+            
+            start = time.perf_counter()
+            analyzer._infer_batches(texts, config.BATCH_SIZE)
+            seconds = time.perf_counter() - start
+        finally:
+            analyzer.close()
+        
+        report.append({
+            'workers': workers,
+            'threads_per_worker': threads,
+            'seconds': seconds,
+            'texts_per_sec': len(texts) / seconds if seconds else 0.0
+        })
+        logger.info(f"📊 {workers} workers: {report[-1]['texts_per_sec']:.1f} texts/sec")
+    
+    return report
@@ -0,0 +1,271 @@
+"""
+Named Hugging Face sentiment models with memory-bounded LRU eviction
+
+Serves several checkpoints (e.g. one per asset class) from one process.
+Models listed in config.SENTIMENT_MODELS are loaded on first request,
+their resident size is recorded, and the least recently used ones are
+dropped whenever the total exceeds the memory budget.
+
+Loads run outside the registry lock (one in flight per name), so a slow
+load never blocks requests for models already resident. Callers hold an
+analyzer through `with registry.use(name) as analyzer:`; an evicted model
+is closed only once the last such block has exited.
+"""
+import gc
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from config import config
+
+logger = logging.getLogger(__name__)
+
+def _current_rss_mb():
+    """Current resident set size of this process in MB (None if unknown)"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def _model_memory_mb(analyzer):
+    """
+    Memory held by an analyzer's weights in MB
+    
+    Parameters and buffers for PyTorch, the graph file for ONNX Runtime,
+    times the number of processes holding a copy. More stable than RSS
+    deltas, which the allocator blurs once models have been evicted.
+    """
+    copies = analyzer.worker_pool.num_workers if analyzer.worker_pool is not None else 1
+    return analyzer.weight_bytes() * copies / 2**20
+
+class ModelRegistry:
+    """
+    Load-on-demand, LRU-evicting registry of HuggingFaceSentimentAnalyzer
+    """
+    
+    def __init__(self, models=None, memory_budget_mb=None, factory=None):
+        """
+        Args:
+            models: name -> HF model id or analyzer kwargs (default from config)
+            memory_budget_mb: Weight memory kept loaded (default from config)
+            factory: Builds an analyzer from those kwargs (default
+                HuggingFaceSentimentAnalyzer)
+        """
+        if models is None:
+            models = config.SENTIMENT_MODELS
+        if memory_budget_mb is None:
+            memory_budget_mb = config.SENTIMENT_MODEL_MEMORY_MB
+        
+        self.models = models
+        self.memory_budget_mb = memory_budget_mb
+        self.factory = factory
+        self._loaded = OrderedDict()  # name -> entry dict, least recently used first
+        self._loading = {}  # name -> Future of the load in flight
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+    
+    def names(self):
+        """Model names that can be requested"""
+        return list(self.models)
+    
+    def use(self, name):
+        """
+        Context manager yielding the analyzer for a configured model name,
+        loading it if needed; the analyzer is not closed before the block exits
+        
+        Raises:
+            KeyError: name is not in config.SENTIMENT_MODELS (on the call,
+                before the block is entered)
+        """
+        if name not in self.models:
+            raise KeyError(f"Unknown sentiment model '{name}' (available: {', '.join(self.models)})")
+        return self._use(name)
+    
+    @contextmanager
+    def _use(self, name):
+        entry = self._acquire(name)
+        try:
+            yield entry['analyzer']
+        finally:
+            self._release(entry)
+    
+    def _acquire(self, name):
+        """Loaded entry for name with one more reference held"""
+        while True:
+            with self._lock:
+                entry = self._loaded.get(name)
+                if entry is not None:
+                    self._loaded.move_to_end(name)
+                    entry['refs'] += 1
+                    entry['hits'] += 1
+                    entry['last_used'] = time.time()
+                    return entry
+                
+                future = self._loading.get(name)
+                loading = future is None
+                if loading:
+                    future = self._loading[name] = Future()
+            
+            if not loading:
+                # Another thread is loading it: wait, then take it (or load
+                # again if it was evicted in the meantime)
+                future.result()
+                continue
+            
+            try:
+                entry = self._load(name)
+            except BaseException as e:
+                with self._lock:
+                    del self._loading[name]
+                future.set_exception(e)
+                raise
+            
+            with self._lock:
+                del self._loading[name]
+                entry['refs'] = 1
+                entry['hits'] = 1
+                self._loaded[name] = entry
+                victims = self._evict(keep=name)
+            future.set_result(None)
+            
+            for victim in victims:
+                self._close(victim)
+            return entry
+    
+    def _release(self, entry):
+        with self._lock:
+            entry['refs'] -= 1
+            close = entry['evicted'] and entry['refs'] == 0
+        if close:
+            self._close(entry)
+    
+    def _load(self, name):
+        factory = self.factory
+        if factory is None:
+            from src.sentiment.hf_sentiment_analyzer import HuggingFaceSentimentAnalyzer as factory
+        
+        spec = self.models[name]
+        kwargs = dict(spec) if isinstance(spec, dict) else {'model_name': spec}
+        
+        logger.info(f"📦 Loading sentiment model '{name}'...")
+        rss_before = _current_rss_mb()
+        start = time.perf_counter()
+        analyzer = factory(**kwargs)
+        seconds = time.perf_counter() - start
+        rss_after = _current_rss_mb()
+        
+        memory_mb = _model_memory_mb(analyzer)
+        self.loads += 1
+        logger.info(f"📦 '{name}' ready in {seconds:.2f}s ({memory_mb:.0f}MB of weights)")
+        
+        return {
+            'name': name,
+            'analyzer': analyzer,
+            'memory_mb': memory_mb,
+            'rss_delta_mb': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            'load_seconds': seconds,
+            'hits': 0,
+            'last_used': time.time(),
+            'refs': 0,  # use() blocks holding the analyzer
+            'evicted': False
+        }
+    
+    def used_mb(self):
+        """Total weight memory of loaded models"""
+        with self._lock:
+            return sum(entry['memory_mb'] for entry in self._loaded.values())
+    
+    def _evict(self, keep=None):
+        """
+        Drop least recently used models until within budget (never `keep`);
+        call with the lock held
+        
+        Returns:
+            list: dropped entries that are not in use, for the caller to
+                close once the lock is released
+        """
+        victims = []
+        while self.used_mb() > self.memory_budget_mb:
+            victim = next((name for name in self._loaded if name != keep), None)
+            if victim is None:
+                logger.warning(f"⚠️  '{keep}' alone exceeds the {self.memory_budget_mb}MB model budget")
+                break
+            entry = self._drop(victim)
+            if entry is not None:
+                victims.append(entry)
+            self.evictions += 1
+        return victims
+    
+    def _drop(self, name):
+        """
+        Forget one loaded model (lock held); returns its entry if it can be
+        closed now, None if absent or still in use (the last release closes it)
+        """
+        entry = self._loaded.pop(name, None)
+        if entry is None:
+            return None
+        entry['evicted'] = True
+        return entry if entry['refs'] == 0 else None
+    
+    def _close(self, entry):
+        entry['analyzer'].close()
+        entry['analyzer'] = None
+        gc.collect()
+        logger.info(f"🗑️  Evicted sentiment model '{entry['name']}'")
+    
+    def unload(self, name):
+        """Forget one loaded model, closing it once no caller is using it"""
+        with self._lock:
+            entry = self._drop(name)
+        if entry is not None:
+            self._close(entry)
+    
+    def clear(self):
+        """Unload every model"""
+        with self._lock:
+            entries = [self._drop(name) for name in list(self._loaded)]
+        for entry in entries:
+            if entry is not None:
+                self._close(entry)
+    
+    def stats(self):
+        """Loaded models, memory use against budget, load/eviction counts"""
+        with self._lock:
+            return {
+                'budget_mb': self.memory_budget_mb,
+                'used_mb': self.used_mb(),
+                'available': self.names(),
+                'loaded': [
+                    {
+                        'name': name,
+                        'memory_mb': entry['memory_mb'],
+                        'rss_delta_mb': entry['rss_delta_mb'],
+                        'load_seconds': entry['load_seconds'],
+                        'hits': entry['hits'],
+                        'in_use': entry['refs']
+                    }
+                    for name, entry in self._loaded.items()
+                ],
+                'loading': list(self._loading),
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_model_registry():
+    """Process-wide model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,249 @@
+"""
+ONNX Runtime backend for the Hugging Face sentiment model
+
+Exports config.HF_SENTIMENT_MODEL to ONNX once (optionally with dynamic
+int8 quantization), caches it under HF_CACHE_DIR and serves it through
+ONNX Runtime with the same call signature as a transformers
+"sentiment-analysis" pipeline, so HuggingFaceSentimentAnalyzer can swap
+it in unchanged.
+
+    python -m src.sentiment.onnx_backend   # export + agreement report
+"""
+import json
+import time
+import logging
+from types import SimpleNamespace
+import numpy as np
+from config import config
+
+logger = logging.getLogger(__name__)
+
+OPSET_VERSION = 17
+
+def onnx_model_dir(model_name=None):
+    """Directory holding the exported model, tokenizer and metadata"""
+    if model_name is None:
+        model_name = config.HF_SENTIMENT_MODEL
+    return config.HF_CACHE_DIR / "onnx" / model_name.replace('/', '--')
+
+def export_onnx(model_name=None, quantize=None, force=False):
+    """
+    Export a sequence-classification checkpoint to ONNX (once)
+    
+    Args:
+        model_name: HF model id or local path (default from config)
+        quantize: Also write a dynamic int8 copy (default from config)
+        force: Re-export even if a cached export exists
+    
+    Returns:
+        Path: the .onnx file to load
+    """
+    if model_name is None:
+        model_name = config.HF_SENTIMENT_MODEL
+    if quantize is None:
+        quantize = config.HF_ONNX_QUANTIZE
+    
+    out_dir = onnx_model_dir(model_name)
+    fp32_path = out_dir / "model.onnx"
+    int8_path = out_dir / "model.int8.onnx"
+    target = int8_path if quantize else fp32_path
+    
+    if target.exists() and not force:
+        return target
+    
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    
+    out_dir.mkdir(parents=True, exist_ok=True)
+    
+    if not fp32_path.exists() or force:
+        logger.info(f"📦 Exporting {model_name} to ONNX...")
+        
+        tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=str(config.HF_CACHE_DIR))
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name, cache_dir=str(config.HF_CACHE_DIR)
+        )
+        model.eval()
+        
+        class _LogitsOnly(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+            
+            def forward(self, input_ids, attention_mask):
+                return self.inner(input_ids=input_ids, attention_mask=attention_mask).logits
+        
+        dummy = tokenizer(["Shares rise after strong earnings"], return_tensors='pt')
+        dynamic = {0: 'batch', 1: 'sequence'}
+        
+        with torch.no_grad():
+            torch.onnx.export(
+                _LogitsOnly(model),
+                (dummy['input_ids'], dummy['attention_mask']),
+                str(fp32_path),
+                input_names=['input_ids', 'attention_mask'],
+                output_names=['logits'],
+                dynamic_axes={'input_ids': dynamic, 'attention_mask': dynamic, 'logits': {0: 'batch'}},
+                opset_version=OPSET_VERSION,
+                dynamo=False
+            )
+        
+        tokenizer.save_pretrained(str(out_dir))
+        model.config.save_pretrained(str(out_dir))
+        
+        meta = {
+            'source_model': model_name,
+            'revision': getattr(model.config, '_commit_hash', None) or 'local',
+            'opset': OPSET_VERSION,
+            'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        (out_dir / "export_meta.json").write_text(json.dumps(meta, indent=2))
+        
+        logger.info(f"✅ ONNX export saved to {fp32_path}")
+    
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        logger.info("🔧 Applying dynamic int8 quantization...")
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+        logger.info(f"✅ Quantized model saved to {int8_path}")
+    
+    return target
+
+class OnnxSentimentPipeline:
+    """
+    Drop-in replacement for a transformers sentiment-analysis pipeline
+    backed by ONNX Runtime
+    """
+    
+    def __init__(self, model_name=None, quantize=None):
+        if model_name is None:
+            model_name = config.HF_SENTIMENT_MODEL
+        if quantize is None:
+            quantize = config.HF_ONNX_QUANTIZE
+        
+        import onnxruntime as ort
+        from transformers import AutoTokenizer, AutoConfig
+        
+        model_path = export_onnx(model_name, quantize=quantize)
+        model_dir = model_path.parent
+        self.model_path = model_path
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        # Mirrors pipeline.model.config so callers can read id2label etc.
+        self.model = SimpleNamespace(config=AutoConfig.from_pretrained(str(model_dir)))
+        self.id2label = self.model.config.id2label
+        
+        meta = json.loads((model_dir / "export_meta.json").read_text())
+        self.revision = meta['revision']
+        self.quantized = quantize
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        
+        logger.info(f"✅ ONNX Runtime session ready ({'int8' if quantize else 'fp32'})")
+    
+    def __call__(self, texts, batch_size=None, **kwargs):
+        """
+        Score texts, returning [{'label': str, 'score': float}, ...]
+        
+        Accepts a single string or a list, like the transformers pipeline.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        if batch_size is None:
+            batch_size = len(texts)
+        
+        results = []
+        for i in range(0, len(texts), max(batch_size, 1)):
+            batch = texts[i:i+batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=kwargs.get('truncation', True),
+                max_length=kwargs.get('max_length'),
+                return_tensors='np'
+            )
+            probs = self._probs(encoded)
+            
+            best = probs.argmax(axis=1)
+            for row, idx in enumerate(best):
+                results.append({
+                    'label': self.id2label[int(idx)],
+                    'score': float(probs[row, idx])
+                })
+        
+        return results
+    
+    def _probs(self, encoded):
+        """Class probabilities for a tokenized, padded batch"""
+        feeds = {name: np.asarray(encoded[name]).astype(np.int64) for name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        
+        # Softmax, numerically stable
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+    
+    def predict_ids(self, token_ids):
+        """Class probabilities for pre-tokenized ids (one list per text)"""
+        encoded = self.tokenizer.pad({'input_ids': token_ids}, return_tensors='np')
+        if 'token_type_ids' in self.input_names and 'token_type_ids' not in encoded:
+            encoded['token_type_ids'] = np.zeros_like(encoded['input_ids'])
+        return self._probs(encoded)
+
+def compare_backends(texts, model_name=None, quantize=None):
+    """
+    Score texts with both the PyTorch and ONNX backends and report agreement
+    
+    Returns:
+        dict: label agreement, compound differences and timings
+    """
+    from src.sentiment.hf_sentiment_analyzer import HuggingFaceSentimentAnalyzer
+    
+    texts = [str(t) for t in texts if t]
+    
+    torch_analyzer = HuggingFaceSentimentAnalyzer(model_name, backend='pytorch', num_workers=1)
+    onnx_analyzer = HuggingFaceSentimentAnalyzer(model_name, backend='onnx', onnx_quantize=quantize, num_workers=1)
+    
+    # Bypass the sentiment cache so both backends actually run
+    start = time.perf_counter()
+    torch_results = torch_analyzer._infer_batches(texts, config.BATCH_SIZE)
+    torch_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    onnx_results = onnx_analyzer._infer_batches(texts, config.BATCH_SIZE)
+    onnx_seconds = time.perf_counter() - start
+    
+    (torch_batch, torch_ok), (onnx_batch, onnx_ok) = torch_results, onnx_results
+    both = np.flatnonzero(torch_ok & onnx_ok)
+    diffs = np.abs(torch_batch.compound[both] - onnx_batch.compound[both]).astype(np.float64)
+    agree = int((torch_batch.label_code[both] == onnx_batch.label_code[both]).sum())
+    
+    report = {
+        'texts': len(both),
+        'quantized': onnx_analyzer.pipeline.quantized,
+        'label_agreement': agree / len(both) if len(both) else 0.0,
+        'mean_abs_compound_diff': float(diffs.mean()) if len(diffs) else 0.0,
+        'max_abs_compound_diff': float(diffs.max()) if len(diffs) else 0.0,
+        'pytorch_seconds': torch_seconds,
+        'onnx_seconds': onnx_seconds,
+        'speedup': torch_seconds / onnx_seconds if onnx_seconds else 0.0
+    }
+    
+    logger.info(f"📊 ONNX vs PyTorch: {report['label_agreement']*100:.1f}% label agreement, "
+                f"{report['speedup']:.2f}x speedup")
+    return report
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    
+    from src.data_collection.hf_data_loader import HuggingFaceDataLoader
+    
+    sample = HuggingFaceDataLoader().load_financial_dataset()['text'].tolist()
+    print(json.dumps(compare_backends(sample), indent=2))
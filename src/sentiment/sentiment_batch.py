@@ -0,0 +1,89 @@
+"""
+Columnar batch-sentiment protocol shared by all analyzers
+
+Every analyzer exposes score_batch(texts) -> SentimentBatch: a struct of
+arrays (float32 compound and score, int8 label codes) instead of one
+dict per text. analyze_dataframe writes those arrays straight into the
+frame, so no per-row Python objects are built on the hot path. Dicts are
+only produced at the edges (single-text analyze, the JSON API, the
+SQLite cache) via to_records().
+"""
+import numpy as np
+
+# Label codes: -1 negative, 0 neutral, 1 positive (index LABELS with code + 1)
+LABELS = ('negative', 'neutral', 'positive')
+LABEL_NAMES = np.array(LABELS, dtype=object)
+
+def label_code(label):
+    """Code for one label string; anything not positive/negative is neutral"""
+    label = str(label).lower()
+    if 'positive' in label:
+        return 1
+    if 'negative' in label:
+        return -1
+    return 0
+
+class SentimentBatch:
+    """
+    Sentiment for N texts as three parallel arrays
+    
+    compound: float32 in [-1, 1]
+    score: float32 confidence (|compound| for VADER)
+    label_code: int8, -1 / 0 / 1
+    """
+    
+    __slots__ = ('compound', 'score', 'label_code')
+    
+    def __init__(self, compound, score, label_code):
+        self.compound = np.asarray(compound, dtype=np.float32)
+        self.score = np.asarray(score, dtype=np.float32)
+        self.label_code = np.asarray(label_code, dtype=np.int8)
+    
+    @classmethod
+    def neutral(cls, n):
+        """N neutral results (score 0), e.g. for missing texts"""
+        return cls(np.zeros(n), np.zeros(n), np.zeros(n))
+    
+    @classmethod
+    def from_records(cls, records):
+        """Build from {'label', 'score', 'compound'} dicts (cache / pipeline output)"""
+        return cls(
+            [r['compound'] for r in records],
+            [r['score'] for r in records],
+            [label_code(r['label']) for r in records]
+        )
+    
+    def __len__(self):
+        return len(self.compound)
+    
+    @property
+    def labels(self):
+        """Label names as an object array"""
+        return LABEL_NAMES[self.label_code + 1]
+    
+    def take(self, indices):
+        """Rows at indices (e.g. broadcast unique-text results back to all rows)"""
+        return SentimentBatch(self.compound[indices], self.score[indices], self.label_code[indices])
+    
+    def put(self, indices, other):
+        """Overwrite rows at indices with another batch, in place"""
+        self.compound[indices] = other.compound
+        self.score[indices] = other.score
+        self.label_code[indices] = other.label_code
+    
+    def to_records(self):
+        """One result dict per text, for JSON responses and the cache"""
+        # float32 -> str -> float keeps the short decimal form (0.4404, not 0.44040000438)
+        return [
+            {'label': label, 'score': float(score), 'compound': float(compound)}
+            for label, score, compound in zip(
+                self.labels.tolist(), self.score.astype(str).tolist(), self.compound.astype(str).tolist()
+            )
+        ]
+    
+    def assign(self, df):
+        """Write sentiment_label/score/compound columns into df"""
+        df['sentiment_label'] = self.labels
+        df['sentiment_score'] = self.score
+        df['sentiment_compound'] = self.compound
+        return df
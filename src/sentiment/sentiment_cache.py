@@ -0,0 +1,226 @@
+"""
+Persistent, content-addressed cache for sentiment results
+
+Results are keyed by (whitespace-collapsed text hash, analyzer type,
+model id) and stored in a local SQLite file, so every analyzer, pipeline
+run and API worker on the host reuses work that has already been done.
+"""
+import atexit
+import hashlib
+import sqlite3
+import threading
+import time
+import logging
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_SQL_CHUNK = 500
+
+# Hits whose last_access update is written (and committed) together
+_TOUCH_BATCH = 1000
+
+# Eviction frees this share of max_entries beyond the excess, so a full
+# cache is not re-counted on every insert
+_EVICT_SLACK = 0.05
+
+def _cache_key_text(text):
+    """Collapse whitespace so trivially different copies share a key"""
+    return ' '.join(str(text).split())
+
+def make_key(text, analyzer_type, model_id):
+    """Content hash for one text under one analyzer/model"""
+    payload = f"{analyzer_type}\x00{model_id}\x00{_cache_key_text(text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class SentimentCache:
+    """
+    Disk-backed sentiment cache with size-bounded LRU eviction
+    
+    Hits only record their access time in memory; the updates are written
+    in batches (and before any eviction), so a lookup that hits costs one
+    SELECT and no commit. The row count is tracked per process and only
+    re-counted when it says the cache may be full.
+    """
+    
+    def __init__(self, path=None, max_entries=None):
+        if path is None:
+            path = config.SENTIMENT_CACHE_PATH
+        if max_entries is None:
+            max_entries = config.SENTIMENT_CACHE_MAX_ENTRIES
+        
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last access not yet written
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            " key TEXT PRIMARY KEY,"
+            " label TEXT NOT NULL,"
+            " score REAL NOT NULL,"
+            " compound REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sentiment_last_access ON sentiment (last_access)"
+        )
+        self._conn.commit()
+        
+        self._count = self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        logger.info(f"💾 Sentiment cache at {self.path} ({self._count} entries)")
+    
+    def __len__(self):
+        with self._lock:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+            return self._count
+    
+    def get(self, text, analyzer_type, model_id):
+        """Return cached result dict for one text, or None"""
+        return self.get_many([text], analyzer_type, model_id)[0]
+    
+    def put(self, text, result, analyzer_type, model_id):
+        """Store result dict for one text"""
+        self.put_many([text], [result], analyzer_type, model_id)
+    
+    def get_many(self, texts, analyzer_type, model_id):
+        """
+        Bulk lookup
+        
+        Returns:
+            list: result dict or None per input text, in input order
+        """
+        keys = [make_key(text, analyzer_type, model_id) for text in texts]
+        found = {}
+        
+        with self._lock:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[i:i+_SQL_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, label, score, compound FROM sentiment WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, label, score, compound in rows:
+                    found[key] = {'label': label, 'score': score, 'compound': compound}
+            
+            if found:
+                now = time.time()
+                self._touched.update((key, now) for key in found)
+                if len(self._touched) >= _TOUCH_BATCH:
+                    self._flush_touched()
+                    self._conn.commit()
+            
+            results = [found.get(key) for key in keys]
+            hits = sum(r is not None for r in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        
+        return results
+    
+    def put_many(self, texts, results, analyzer_type, model_id):
+        """Bulk insert, then evict least-recently-used rows past max_entries"""
+        now = time.time()
+        rows = [
+            (make_key(text, analyzer_type, model_id),
+             r['label'], float(r['score']), float(r['compound']), now)
+            for text, r in zip(texts, results)
+        ]
+        if not rows:
+            return
+        
+        with self._lock:
+            # New keys are inserted; the rowcount tells how many rows were added
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO sentiment (key, label, score, compound, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows
+            ).rowcount
+            if added < len(rows):
+                self._conn.executemany(
+                    "UPDATE sentiment SET label = ?, score = ?, compound = ?, last_access = ? WHERE key = ?",
+                    [(label, score, compound, last_access, key) for key, label, score, compound, last_access in rows]
+                )
+            self._count += added
+            
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+    
+    def _flush_touched(self):
+        """Write pending last_access updates (caller holds the lock and commits)"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE sentiment SET last_access = ? WHERE key = ?",
+                [(now, key) for key, now in self._touched.items()]
+            )
+            self._touched.clear()
+    
+    def _evict(self):
+        """Drop oldest entries beyond max_entries (caller holds the lock)"""
+        # Other processes write to the same file, so count for real first
+        self._count = self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess > 0:
+            excess += int(self.max_entries * _EVICT_SLACK)
+            self._flush_touched()
+            self._conn.execute(
+                "DELETE FROM sentiment WHERE key IN ("
+                " SELECT key FROM sentiment ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self._count = max(self._count - excess, 0)
+            logger.info(f"Evicted {excess} sentiment cache entries")
+    
+    def flush(self):
+        """Write access times of recent hits to disk"""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+    
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM sentiment")
+            self._conn.commit()
+            self._touched.clear()
+            self._count = 0
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self),
+            'max_entries': self.max_entries
+        }
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_sentiment_cache():
+    """
+    Process-wide cache instance shared by all analyzers
+    
+    Returns None when caching is disabled in config.
+    """
+    global _shared_cache
+    if not config.USE_CACHE:
+        return None
+    
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SentimentCache()
+            atexit.register(_shared_cache.flush)
+    return _shared_cache
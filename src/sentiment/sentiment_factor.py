@@ -1,22 +1,110 @@
 """
 Factory to create appropriate sentiment analyzer based on config
+
+Analyzer modules (and torch/transformers/vaderSentiment behind them) are
+only imported when an analyzer of that type is first built.
+get_sentiment_analyzer() keeps one instance per mode for the whole
+process; warmup() pays the first-call cost before traffic arrives.
 """
 import logging
+import threading
+import time
 from config import config
 
 logger = logging.getLogger(__name__)
 
-def create_sentiment_analyzer():
+WARMUP_TEXTS = [
+    "Stock prices are rising due to strong earnings reports.",
+    "The company reported a significant drop in revenue this quarter.",
+    "Market uncertainty leads to cautious trading.",
+    "Record quarterly profit announced today.",
+]
+
+_registry = {}
+_registry_lock = threading.RLock()  # Re-entrant: cascade builds its sub-analyzers here
+
+def create_sentiment_analyzer(mode=None):
     """
     Create sentiment analyzer based on configuration
     
-    Returns appropriate analyzer (HuggingFace or VADER)
+    Returns appropriate analyzer (HuggingFace, VADER, the VADER ->
+    HuggingFace cascade, the distilled student or gold-label passthrough).
+    Always builds a new instance; prefer get_sentiment_analyzer() in
+    long-lived processes.
     """
-    if config.USE_HF_SENTIMENT:
+    if mode is None:
+        mode = config.SENTIMENT_MODE
+    
+    if mode == 'cascade':
+        logger.info("Creating cascade (VADER -> Hugging Face) sentiment analyzer...")
+        from src.sentiment.cascade_analyzer import CascadeSentimentAnalyzer
+        return CascadeSentimentAnalyzer()
+    elif mode == 'gold':
+        logger.info("Creating gold-label sentiment passthrough...")
+        from src.sentiment.gold_label_analyzer import GoldLabelSentimentAnalyzer
+        return GoldLabelSentimentAnalyzer()
+    elif mode == 'student':
+        logger.info("Creating distilled student sentiment analyzer...")
+        from src.sentiment.student_analyzer import StudentSentimentAnalyzer
+        return StudentSentimentAnalyzer()
+    elif mode == 'huggingface':
         logger.info("Creating Hugging Face sentiment analyzer...")
         from src.sentiment.hf_sentiment_analyzer import HuggingFaceSentimentAnalyzer
         return HuggingFaceSentimentAnalyzer()
     else:
         logger.info("Creating VADER sentiment analyzer...")
         from src.sentiment.vader_analyzer import VADERSentimentAnalyzer
-        return VADERSentimentAnalyzer()
\ No newline at end of file
+        return VADERSentimentAnalyzer()
+
+def get_sentiment_analyzer(mode=None):
+    """
+    Return the process-wide analyzer for a mode, building it on first use
+    """
+    if mode is None:
+        mode = config.SENTIMENT_MODE
+    
+    analyzer = _registry.get(mode)
+    if analyzer is not None:
+        return analyzer
+    
+    with _registry_lock:
+        # Another thread may have built it while we waited
+        if mode not in _registry:
+            start = time.perf_counter()
+            _registry[mode] = create_sentiment_analyzer(mode)
+            logger.info(f"Sentiment analyzer '{mode}' ready in {time.perf_counter() - start:.2f}s")
+        return _registry[mode]
+
+def warmup(mode=None, texts=None):
+    """
+    Build the analyzer for a mode and run a dummy batch through it
+    
+    Takes first-call costs (lazy init, allocator growth, kernel selection)
+    off the first real request. Calls pass use_cache=False (down to a
+    cascade's sub-analyzers too), so dummy texts neither hit nor pollute
+    the sentiment cache, and requests already using the shared analyzer
+    are unaffected.
+    
+    Returns:
+        float: seconds spent
+    """
+    if texts is None:
+        texts = WARMUP_TEXTS
+    
+    start = time.perf_counter()
+    analyzer = get_sentiment_analyzer(mode)
+    
+    analyzer.analyze(texts[0], use_cache=False)
+    analyzer.score_batch(texts, use_cache=False)
+    
+    seconds = time.perf_counter() - start
+    logger.info(f"🔥 Sentiment warmup done in {seconds:.2f}s")
+    return seconds
+
+def clear_registry():
+    """Drop cached analyzers (stopping any worker processes they own)"""
+    with _registry_lock:
+        for analyzer in _registry.values():
+            if hasattr(analyzer, 'close'):
+                analyzer.close()
+        _registry.clear()
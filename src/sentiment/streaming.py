@@ -0,0 +1,85 @@
+"""
+Streaming sentiment scoring for inputs larger than memory
+
+Works with any analyzer exposing analyze_dataframe. Sources can be an
+iterable of texts or an iterable of DataFrame chunks, e.g.
+pd.read_csv(path, chunksize=...). Only one chunk is held at a time.
+"""
+import itertools
+import logging
+import pandas as pd
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Marks an exhausted source (None is a valid, neutral-scoring text)
+_END = object()
+
+def iter_sentiment(analyzer, source, text_column=None, chunk_size=None):
+    """
+    Yield scored DataFrame chunks as they complete
+    
+    Args:
+        analyzer: VADER or Hugging Face sentiment analyzer
+        source: Iterable of texts, or iterable of DataFrames
+        text_column: Column holding the text (DataFrame chunks use the
+            analyzer's default when None; text streams use 'text')
+        chunk_size: Texts per chunk for text streams (default from config)
+    
+    Yields:
+        pd.DataFrame: chunk with sentiment_label/score/compound columns
+    """
+    if chunk_size is None:
+        chunk_size = config.STREAM_CHUNK_SIZE
+    
+    iterator = iter(source)
+    first = next(iterator, _END)
+    if first is _END:
+        return
+    iterator = itertools.chain([first], iterator)
+    
+    if isinstance(first, pd.DataFrame):
+        chunks = iterator
+        kwargs = {'text_column': text_column} if text_column else {}
+    else:
+        text_column = text_column or 'text'
+        chunks = (
+            pd.DataFrame({text_column: list(batch)})
+            for batch in _batched(iterator, chunk_size)
+        )
+        kwargs = {'text_column': text_column}
+    
+    processed = 0
+    for chunk in chunks:
+        scored = analyzer.analyze_dataframe(chunk, **kwargs)
+        processed += len(scored)
+        logger.info(f"Streamed {processed} records")
+        yield scored
+
+def score_csv(analyzer, input_path, output_path, text_column, chunk_size=None):
+    """
+    Score a CSV of any size chunk by chunk, appending to output_path
+    
+    Returns:
+        int: number of rows written
+    """
+    if chunk_size is None:
+        chunk_size = config.STREAM_CHUNK_SIZE
+    
+    rows = 0
+    reader = pd.read_csv(input_path, chunksize=chunk_size)
+    for i, chunk in enumerate(iter_sentiment(analyzer, reader, text_column=text_column)):
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows += len(chunk)
+    
+    logger.info(f"Saved {rows} scored rows to {output_path}")
+    return rows
+
+def _batched(iterable, size):
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,242 @@
+"""
+Distilled student sentiment model (hashed n-grams + linear classifier)
+
+A middle tier between VADER and the transformer: a linear model over
+hashed word n-grams, trained on labels produced by the Hugging Face
+teacher (or on the dataset's gold labels). HashingVectorizer is
+stateless, so there is no vocabulary to fit or ship, and scoring costs
+one sparse matrix product per batch.
+
+Teacher labelling, training and scoring all see texts through
+text_normalizer.normalize_text, with the settings recorded in the saved
+model, so the hashed features at serve time (where analyze_dataframe
+dedupes normalized texts) match the ones the student was trained on.
+"""
+import json
+import time
+import logging
+import joblib
+import numpy as np
+import pandas as pd
+from config import config
+from src.sentiment.sentiment_batch import SentimentBatch, LABELS, label_code
+from src.sentiment.streaming import iter_sentiment
+from src.sentiment.text_normalizer import dedupe_texts, normalize_text
+
+logger = logging.getLogger(__name__)
+
+def _make_vectorizer(n_features=None, ngram_range=None):
+    from sklearn.feature_extraction.text import HashingVectorizer
+    
+    if n_features is None:
+        n_features = config.STUDENT_HASH_FEATURES
+    if ngram_range is None:
+        ngram_range = config.STUDENT_NGRAM_RANGE
+    
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=tuple(ngram_range),
+        alternate_sign=False,
+        norm='l2',
+        lowercase=True
+    )
+
+def normalization_settings():
+    """normalize_text settings from config, as recorded with a trained student"""
+    return {
+        'lowercase': config.TEXT_NORMALIZE_LOWERCASE,
+        'strip_urls': config.TEXT_STRIP_URLS,
+        'mask_cashtags': config.TEXT_MASK_CASHTAGS
+    }
+
+def teacher_labels(texts, teacher=None, normalization=None):
+    """
+    Label texts with the Hugging Face analyzer
+    
+    The teacher sees the normalized texts the student trains on
+    (normalization: normalize_text settings, default from config).
+    """
+    if teacher is None:
+        from src.sentiment.sentiment_factor import get_sentiment_analyzer
+        teacher = get_sentiment_analyzer('huggingface')
+    if normalization is None:
+        normalization = normalization_settings()
+    
+    texts = [normalize_text(text, **normalization) for text in texts]
+    logger.info(f"🧑‍🏫 Labelling {len(texts)} texts with the teacher model...")
+    return [result['label'] for result in teacher.analyze_batch(texts)]
+
+def train_student(texts, labels, label_source='teacher', path=None, normalization=None):
+    """
+    Fit the student on (text, label) pairs and save it to MODELS_DIR
+    
+    A held-out split (1 - TRAIN_TEST_SPLIT) measures how often the
+    student agrees with the labels it was trained on.
+    
+    Args:
+        texts: Training texts
+        labels: 'negative' / 'neutral' / 'positive' per text
+        label_source: 'teacher' or 'gold', recorded in the report
+        path: Output file (default from config)
+        normalization: normalize_text settings applied to the texts and
+            saved with the model (default from config)
+    
+    Returns:
+        dict: agreement report (also saved next to the model as JSON)
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.model_selection import train_test_split
+    
+    if path is None:
+        path = config.SENTIMENT_STUDENT_PATH
+    if normalization is None:
+        normalization = normalization_settings()
+    
+    texts = [normalize_text(text, **normalization) for text in texts]
+    frame = pd.DataFrame({'text': texts, 'label': list(labels)})
+    frame = frame[frame['text'] != '']
+    frame = frame[frame['label'].isin(list(LABELS))]
+    
+    stratify = frame['label'] if frame['label'].value_counts().min() >= 2 else None
+    train, test = train_test_split(
+        frame, train_size=config.TRAIN_TEST_SPLIT,
+        random_state=config.RANDOM_STATE, stratify=stratify
+    )
+    
+    vectorizer = _make_vectorizer()
+    classifier = SGDClassifier(
+        loss='log_loss', alpha=1e-5, max_iter=50, tol=1e-4,
+        class_weight='balanced', random_state=config.RANDOM_STATE
+    )
+    
+    logger.info(f"🎓 Training student on {len(train)} texts ({label_source} labels)...")
+    start = time.perf_counter()
+    classifier.fit(vectorizer.transform(train['text'].astype(str)), train['label'])
+    train_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    predicted = classifier.predict(vectorizer.transform(test['text'].astype(str)))
+    predict_seconds = time.perf_counter() - start
+    
+    report = {
+        'label_source': label_source,
+        'normalization': normalization,
+        'train_size': len(train),
+        'test_size': len(test),
+        'agreement': float(accuracy_score(test['label'], predicted)),
+        'per_class': classification_report(
+            test['label'], predicted, labels=list(LABELS), output_dict=True, zero_division=0
+        ),
+        'train_seconds': train_seconds,
+        'texts_per_sec': len(test) / predict_seconds if predict_seconds else 0.0,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump({
+        'classifier': classifier,
+        'n_features': vectorizer.n_features,
+        'ngram_range': list(vectorizer.ngram_range),
+        'normalization': normalization,
+        'report': report
+    }, path)
+    path.with_suffix('.json').write_text(json.dumps(report, indent=2))
+    
+    logger.info(f"💾 Saved student model to {path}")
+    logger.info(f"🤝 Agreement with {label_source} labels: {report['agreement']*100:.1f}%")
+    
+    return report
+
+class StudentSentimentAnalyzer:
+    """
+    Sentiment analysis with the distilled hashed n-gram student
+    
+    Scores in the same ballpark as VADER, so results are not routed
+    through the SQLite sentiment cache (a lookup would cost more than the
+    model).
+    """
+    
+    def __init__(self, path=None):
+        if path is None:
+            path = config.SENTIMENT_STUDENT_PATH
+        
+        if not path.exists():
+            raise FileNotFoundError(
+                f"No student model at {path}; train one with `python run_distill.py`"
+            )
+        
+        logger.info(f"Loading student sentiment model from {path}")
+        
+        artifact = joblib.load(path)
+        self.classifier = artifact['classifier']
+        self.vectorizer = _make_vectorizer(artifact['n_features'], artifact['ngram_range'])
+        self.report = artifact.get('report', {})
+        # Models saved before normalization was recorded were trained on raw text
+        self.normalization = artifact.get('normalization')
+        if self.normalization is not None and self.normalization != normalization_settings():
+            logger.warning(f"⚠️  Student was trained with normalization {self.normalization}, "
+                           f"config now has {normalization_settings()}; scoring with the trained settings")
+        
+        # Label code per predict_proba column
+        self._class_codes = np.array([label_code(c) for c in self.classifier.classes_], dtype=np.int8)
+    
+    def score_batch(self, texts, use_cache=True):
+        """
+        Score a list of texts into a SentimentBatch
+        
+        Texts are normalized as at training time (a no-op for texts
+        analyze_dataframe already deduped). Missing and empty texts come
+        back neutral with score 0. use_cache is accepted for a uniform
+        interface; nothing is cached.
+        """
+        texts = list(texts)
+        batch = SentimentBatch.neutral(len(texts))
+        
+        if self.normalization is not None:
+            texts = [normalize_text(text, **self.normalization) for text in texts]
+        present = [i for i, text in enumerate(texts) if text and not pd.isna(text)]
+        if present:
+            proba = self.classifier.predict_proba(
+                self.vectorizer.transform([str(texts[i]) for i in present])
+            )
+            best = proba.argmax(axis=1)
+            codes = self._class_codes[best]
+            score = proba[np.arange(len(present)), best]
+            # Same convention as the Hugging Face analyzer: +score, -score or 0
+            batch.put(present, SentimentBatch(codes * score, score, codes))
+        
+        return batch
+    
+    def analyze(self, text, use_cache=True):
+        """Analyze single text"""
+        return self.score_batch([text]).to_records()[0]
+    
+    def analyze_batch(self, texts):
+        """Analyze multiple texts, returning one result dict per text"""
+        return self.score_batch(texts).to_records()
+    
+    def analyze_dataframe(self, df, text_column=None, dedupe=None):
+        """Add sentiment to dataframe (scoring unique normalized texts once if dedupe)"""
+        if text_column is None:
+            text_column = config.SENTIMENT_TEXT_COLUMN
+        if dedupe is None:
+            dedupe = config.SENTIMENT_DEDUPE
+        
+        logger.info(f"Analyzing sentiment for {len(df)} records")
+        
+        texts = df[text_column].tolist()
+        if dedupe:
+            uniques, codes, self.last_dedup_ratio = dedupe_texts(texts)
+            batch = self.score_batch(uniques).take(codes)
+        else:
+            batch = self.score_batch(texts)
+        
+        batch.assign(df)
+        
+        logger.info(f"Sentiment distribution: {df['sentiment_label'].value_counts().to_dict()}")
+        return df
+    
+    def analyze_stream(self, source, text_column=None, chunk_size=None):
+        """Score an iterable of texts or DataFrame chunks, yielding scored chunks"""
+        return iter_sentiment(self, source, text_column=text_column, chunk_size=chunk_size)
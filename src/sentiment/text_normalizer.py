@@ -0,0 +1,94 @@
+"""
+Text normalization and deduplication before sentiment inference
+
+News built from a finite corpus repeats the same sentences many times
+(create_stock_news_dataset samples 1-3 per stock row). Normalizing and
+scoring only the unique strings, then broadcasting back, avoids paying
+for the same inference over and over.
+"""
+import re
+import logging
+import pandas as pd
+from config import config
+
+logger = logging.getLogger(__name__)
+
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+CASHTAG_PATTERN = re.compile(r'\$[A-Za-z][A-Za-z0-9.\-]{0,9}\b')
+CASHTAG_TOKEN = '$TICKER'
+# NewsAPI cuts 'content' and appends e.g. "… [+2345 chars]"
+TRUNCATION_MARKER_PATTERN = re.compile(r'\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$')
+
+def normalize_text(text, lowercase=None, strip_urls=None, mask_cashtags=None):
+    """
+    Canonical form of a text for sentiment scoring
+    
+    Strips URLs, masks cashtags ($AAPL -> $TICKER), optionally lowercases
+    and collapses whitespace. Missing values become "".
+    """
+    if lowercase is None:
+        lowercase = config.TEXT_NORMALIZE_LOWERCASE
+    if strip_urls is None:
+        strip_urls = config.TEXT_STRIP_URLS
+    if mask_cashtags is None:
+        mask_cashtags = config.TEXT_MASK_CASHTAGS
+    
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return ""
+    
+    text = str(text)
+    if strip_urls:
+        text = URL_PATTERN.sub(' ', text)
+    if mask_cashtags:
+        text = CASHTAG_PATTERN.sub(CASHTAG_TOKEN, text)
+    if lowercase:
+        text = text.lower()
+    
+    return ' '.join(text.split())
+
+def dedupe_texts(texts):
+    """
+    Normalize texts and collapse duplicates
+    
+    Returns:
+        tuple: (unique normalized texts, index into them per input text,
+        dedup ratio = share of inputs that did not need scoring)
+    """
+    normalized = [normalize_text(text) for text in texts]
+    codes, uniques = pd.factorize(pd.Series(normalized, dtype=object))
+    
+    total = len(normalized)
+    ratio = 1 - len(uniques) / total if total else 0.0
+    logger.info(f"Dedup: {total} texts -> {len(uniques)} unique ({ratio*100:.1f}% skipped)")
+    
+    return list(uniques), codes, ratio
+
+def article_text(df, columns=None):
+    """
+    One text per article from its title/description/content fields
+    
+    Missing fields are skipped, NewsAPI's truncation marker is dropped,
+    and overlapping fields (content that repeats the description) are
+    kept once. Meant for windowed scoring
+    (HuggingFaceSentimentAnalyzer.score_long) of full articles.
+    """
+    if columns is None:
+        columns = config.ARTICLE_TEXT_COLUMNS
+    columns = [c for c in columns if c in df.columns]
+    
+    texts = []
+    for row in df[columns].itertuples(index=False):
+        parts = []
+        for value in row:
+            if value is None or (not isinstance(value, str) and pd.isna(value)):
+                continue
+            value = TRUNCATION_MARKER_PATTERN.sub('', str(value)).strip()
+            if not value or (parts and value in parts[-1]):
+                continue
+            if parts and parts[-1] in value:
+                parts[-1] = value  # Content usually opens with the description
+            else:
+                parts.append(value)
+        texts.append('\n'.join(parts))
+    
+    return pd.Series(texts, index=df.index, dtype=object)
@@ -0,0 +1,119 @@
+"""
+Pre-tokenized Arrow cache for the Hugging Face sentiment model
+
+Tokenizes a text corpus (e.g. the standardized 'text' column from
+HuggingFaceDataLoader.load_financial_dataset) once and stores token ids
+as a `datasets` Arrow table under HF_CACHE_DIR/token_cache. The cache is
+keyed by tokenizer fingerprint, max_seq_len and corpus content, so later
+runs memory-map it and feed ids straight to the model without
+re-tokenizing.
+"""
+import hashlib
+import logging
+from config import config
+from src.sentiment.text_normalizer import normalize_text
+
+logger = logging.getLogger(__name__)
+
+def tokenizer_fingerprint(tokenizer, max_seq_len):
+    """Stable hash of tokenizer vocabulary/rules and truncation length"""
+    digest = hashlib.sha256()
+    backend = getattr(tokenizer, 'backend_tokenizer', None)
+    if backend is not None:
+        digest.update(backend.to_str().encode('utf-8'))
+    else:
+        from datasets.fingerprint import Hasher
+        digest.update(Hasher.hash(tokenizer).encode('utf-8'))
+    digest.update(f"{tokenizer.name_or_path}:{max_seq_len}".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def _corpus_fingerprint(keys):
+    digest = hashlib.sha256()
+    for key in keys:
+        digest.update(key.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()[:16]
+
+class TokenCache:
+    """
+    Text -> token ids lookup over a memory-mapped Arrow dataset
+    """
+    
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self._rows = {text: row for row, text in enumerate(dataset['text'])}
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def lookup(self, texts):
+        """
+        Token ids per text, or None for texts not in the cache
+        
+        Returns:
+            tuple: (list of id lists or None, list of truncated flags or None)
+        """
+        hits = [(i, self._rows[text]) for i, text in enumerate(texts) if text in self._rows]
+        ids = [None] * len(texts)
+        truncated = [None] * len(texts)
+        if not hits:
+            return ids, truncated
+        
+        subset = self.dataset.select([row for _, row in hits])
+        for (i, _), row_ids, row_truncated in zip(hits, subset['input_ids'], subset['truncated']):
+            ids[i] = list(row_ids)
+            truncated[i] = bool(row_truncated)
+        
+        return ids, truncated
+
+def build_token_cache(texts, analyzer, normalize=None):
+    """
+    Load the token cache for a corpus, tokenizing it only if needed
+    
+    Args:
+        texts: Corpus texts, e.g. financial_df['text']
+        analyzer: HuggingFaceSentimentAnalyzer whose tokenizer and
+            max_seq_len define the cache
+        normalize: Key texts the way analyze_dataframe will present them
+            (default: config.SENTIMENT_DEDUPE)
+    
+    Returns:
+        TokenCache
+    """
+    from datasets import Dataset, load_from_disk
+    
+    if normalize is None:
+        normalize = config.SENTIMENT_DEDUPE
+    
+    tokenizer = analyzer.tokenizer
+    max_seq_len = analyzer.max_seq_len
+    
+    keys = [normalize_text(t) if normalize else str(t) for t in texts if t and str(t).strip()]
+    keys = list(dict.fromkeys(keys))
+    
+    fingerprint = tokenizer_fingerprint(tokenizer, max_seq_len)
+    path = config.HF_CACHE_DIR / "token_cache" / f"{fingerprint}-{_corpus_fingerprint(keys)}"
+    
+    if path.exists():
+        dataset = load_from_disk(str(path))
+        logger.info(f"📂 Loaded {len(dataset)} pre-tokenized texts from {path}")
+        return TokenCache(dataset)
+    
+    logger.info(f"🔤 Tokenizing {len(keys)} texts once into {path}...")
+    
+    def tokenize(batch):
+        ids = tokenizer(batch['text'], truncation=True, max_length=max_seq_len)['input_ids']
+        raw = tokenizer(batch['text'], truncation=False)['input_ids']
+        return {
+            'input_ids': ids,
+            'length': [len(row) for row in ids],
+            'truncated': [len(row) > max_seq_len for row in raw]
+        }
+    
+    dataset = Dataset.from_dict({'text': keys}).map(tokenize, batched=True, batch_size=1000)
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dataset.save_to_disk(str(path))
+    logger.info(f"💾 Saved token cache ({len(dataset)} texts)")
+    
+    return TokenCache(load_from_disk(str(path)))
@@ -1,47 +1,404 @@
 """
 Fast sentiment analysis using VADER
 """
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from vaderSentiment.vaderSentiment import (
+    SentimentIntensityAnalyzer, BOOSTER_DICT, SPECIAL_CASES, NEGATE, C_INCR, N_SCALAR
+)
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import math
+import multiprocessing
+import string
+import threading
+import numpy as np
 import pandas as pd
 import logging
+from config import config
+from src.sentiment.sentiment_batch import SentimentBatch
+from src.sentiment.streaming import iter_sentiment
+from src.sentiment.text_normalizer import dedupe_texts
 
 logger = logging.getLogger(__name__)
 
+LABEL_THRESHOLD = 0.05
+
+class BatchVADEREngine:
+    """
+    Batched re-implementation of SentimentIntensityAnalyzer.polarity_scores
+    
+    Follows vaderSentiment rule for rule (including its quirks), so the
+    compound scores are identical, but the lexicon, booster and negation
+    tables are compiled once and each token is split, stripped and
+    lowercased once per text instead of once per rule that looks at it.
+    Token shapes are memoized across the whole batch.
+    """
+    
+    MEMO_MAX_ENTRIES = 500_000
+    
+    def __init__(self, analyzer=None):
+        if analyzer is None:
+            analyzer = SentimentIntensityAnalyzer()
+        self.lexicon = analyzer.lexicon
+        # polarity_scores translates emojis char by char, so only
+        # single-character entries can ever match
+        self.emojis = {k: v for k, v in analyzer.emojis.items() if len(k) == 1}
+        self.boosters = BOOSTER_DICT
+        self.special_cases = SPECIAL_CASES
+        self.negations = frozenset(NEGATE)
+        self._punctuation = string.punctuation
+        self._tokens = {}
+    
+    def _token(self, token):
+        """(stripped token, lowercase, isupper, negation) for a raw token"""
+        shape = self._tokens.get(token)
+        if shape is None:
+            stripped = token.strip(self._punctuation)
+            if len(stripped) <= 2:
+                stripped = token  # Likely an emoticon, keep it whole
+            lower = stripped.lower()
+            shape = (stripped, lower, stripped.isupper(),
+                     lower in self.negations or "n't" in lower)
+            if len(self._tokens) >= self.MEMO_MAX_ENTRIES:
+                self._tokens.clear()
+            self._tokens[token] = shape
+        return shape
+    
+    def _translate_emojis(self, text):
+        if text.isascii():
+            return text
+        
+        emojis = self.emojis
+        parts = []
+        prev_space = True
+        for char in text:
+            description = emojis.get(char)
+            if description is not None:
+                if not prev_space:
+                    parts.append(' ')
+                parts.append(description)
+                prev_space = False
+            else:
+                parts.append(char)
+                prev_space = char == ' '
+        return ''.join(parts).strip()
+    
+    def compound(self, text):
+        """Compound score of one text, equal to polarity_scores(text)['compound']"""
+        text = self._translate_emojis(text)
+        shapes = [self._token(token) for token in text.split()]
+        if not shapes:
+            return 0.0
+        
+        lexicon = self.lexicon
+        boosters = self.boosters
+        words = [shape[0] for shape in shapes]
+        lower = [shape[1] for shape in shapes]
+        upper = [shape[2] for shape in shapes]
+        n = len(shapes)
+        allcaps = sum(upper)
+        is_cap_diff = 0 < n - allcaps < n
+        
+        sentiments = []
+        for i in range(n):
+            item = lower[i]
+            if item in boosters or (i < n - 1 and item == "kind" and lower[i + 1] == "of"):
+                sentiments.append(0)
+                continue
+            if item not in lexicon:
+                sentiments.append(0)
+                continue
+            
+            valence = lexicon[item]
+            if item == "no" and i != n - 1 and lower[i + 1] in lexicon:
+                valence = 0.0
+            if (i > 0 and lower[i - 1] == "no") \
+               or (i > 1 and lower[i - 2] == "no") \
+               or (i > 2 and lower[i - 3] == "no" and lower[i - 1] in ("or", "nor")):
+                valence = lexicon[item] * N_SCALAR
+            
+            if upper[i] and is_cap_diff:
+                valence = valence + C_INCR if valence > 0 else valence - C_INCR
+            
+            for start_i in range(3):
+                j = i - (start_i + 1)
+                if i <= start_i or lower[j] in lexicon:
+                    continue
+                
+                # Booster / dampener scalar (vaderSentiment.scalar_inc_dec)
+                s = 0.0
+                if lower[j] in boosters:
+                    s = boosters[lower[j]]
+                    if valence < 0:
+                        s *= -1
+                    if upper[j] and is_cap_diff:
+                        s = s + C_INCR if valence > 0 else s - C_INCR
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                valence = self._negation_check(valence, lower, shapes, start_i, i)
+                if start_i == 2:
+                    valence = self._special_idioms_check(valence, lower, i)
+            
+            # "least" as negation, unless "at least" / "very least"
+            if i > 1 and lower[i - 1] not in lexicon and lower[i - 1] == "least":
+                if lower[i - 2] != "at" and lower[i - 2] != "very":
+                    valence = valence * N_SCALAR
+            elif i > 0 and lower[i - 1] not in lexicon and lower[i - 1] == "least":
+                valence = valence * N_SCALAR
+            
+            sentiments.append(valence)
+        
+        if 'but' in lower:
+            sentiments = self._but_check(lower.index('but'), sentiments)
+        
+        sum_s = float(sum(sentiments))
+        # Punctuation emphasis
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+        
+        compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+        return round(min(max(compound, -1.0), 1.0), 4)
+    
+    @staticmethod
+    def _negation_check(valence, lower, shapes, start_i, i):
+        if start_i == 0:
+            if shapes[i - 1][3]:
+                valence = valence * N_SCALAR
+        elif start_i == 1:
+            if lower[i - 2] == "never" and (lower[i - 1] == "so" or lower[i - 1] == "this"):
+                valence = valence * 1.25
+            elif lower[i - 2] == "without" and lower[i - 1] == "doubt":
+                pass
+            elif shapes[i - 2][3]:
+                valence = valence * N_SCALAR
+        else:
+            # Same precedence as upstream: (never and so/this) or (so/this)
+            if lower[i - 3] == "never" and (lower[i - 2] == "so" or lower[i - 2] == "this") or \
+                    (lower[i - 1] == "so" or lower[i - 1] == "this"):
+                valence = valence * 1.25
+            elif lower[i - 3] == "without" and (lower[i - 2] == "doubt" or lower[i - 1] == "doubt"):
+                pass
+            elif shapes[i - 3][3]:
+                valence = valence * N_SCALAR
+        return valence
+    
+    def _special_idioms_check(self, valence, lower, i):
+        special_cases = self.special_cases
+        onezero = f"{lower[i - 1]} {lower[i]}"
+        twoonezero = f"{lower[i - 2]} {lower[i - 1]} {lower[i]}"
+        twoone = f"{lower[i - 2]} {lower[i - 1]}"
+        threetwoone = f"{lower[i - 3]} {lower[i - 2]} {lower[i - 1]}"
+        threetwo = f"{lower[i - 3]} {lower[i - 2]}"
+        
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in special_cases:
+                valence = special_cases[seq]
+                break
+        
+        if len(lower) - 1 > i:
+            zeroone = f"{lower[i]} {lower[i + 1]}"
+            if zeroone in special_cases:
+                valence = special_cases[zeroone]
+        if len(lower) - 1 > i + 1:
+            zeroonetwo = f"{lower[i]} {lower[i + 1]} {lower[i + 2]}"
+            if zeroonetwo in special_cases:
+                valence = special_cases[zeroonetwo]
+        
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in self.boosters:
+                valence = valence + self.boosters[n_gram]
+        return valence
+    
+    @staticmethod
+    def _but_check(bi, sentiments):
+        # Kept verbatim: upstream looks positions up by value, so repeated
+        # valences are rescaled at their first occurrence
+        for sentiment in sentiments:
+            si = sentiments.index(sentiment)
+            if si < bi:
+                sentiments.pop(si)
+                sentiments.insert(si, sentiment * 0.5)
+            elif si > bi:
+                sentiments.pop(si)
+                sentiments.insert(si, sentiment * 1.5)
+        return sentiments
+    
+    def compound_batch(self, texts):
+        """Float64 compound per text; missing and empty texts score 0"""
+        compound = np.zeros(len(texts), dtype=np.float64)
+        for i, text in enumerate(texts):
+            if not text or pd.isna(text):
+                continue
+            compound[i] = self.compound(str(text))
+        
+        return compound
+    
+    def score_batch(self, texts):
+        """Score a list of texts into a SentimentBatch"""
+        return _batch_from_compound(self.compound_batch(texts))
+
+# Per-process engine used by pool workers (built once by the initializer)
+_worker_engine = None
+
+def _init_worker():
+    """Build the VADER engine once per worker process"""
+    global _worker_engine
+    _worker_engine = BatchVADEREngine()
+
+def _compound_chunk(texts, engine=None):
+    """Score a chunk of texts into a compound array"""
+    if engine is None:
+        engine = _worker_engine
+    return engine.compound_batch(texts)
+
+def _result_from_compound(compound):
+    """Build the label/score/compound dict for one compound value"""
+    if compound >= LABEL_THRESHOLD:
+        label = 'positive'
+    elif compound <= -LABEL_THRESHOLD:
+        label = 'negative'
+    else:
+        label = 'neutral'
+    
+    return {
+        'label': label,
+        'score': abs(compound),
+        'compound': compound
+    }
+
+def _batch_from_compound(compound):
+    """Vectorized compound -> SentimentBatch (same thresholds as analyze)"""
+    # Threshold in float64, before the batch narrows to float32
+    codes = np.zeros(len(compound), dtype=np.int8)
+    codes[compound >= LABEL_THRESHOLD] = 1
+    codes[compound <= -LABEL_THRESHOLD] = -1
+    return SentimentBatch(compound, np.abs(compound), codes)
+
 class VADERSentimentAnalyzer:
+    """
+    Sentiment analysis with VADER
+    
+    Scoring a text costs microseconds, less than a lookup in the SQLite
+    sentiment cache, so results are not cached.
+    """
+    
     def __init__(self):
         logger.info("Loading VADER sentiment analyzer")
         self.analyzer = SentimentIntensityAnalyzer()
+        self.engine = BatchVADEREngine(self.analyzer)
+        self._pool = None  # Process pool for large inputs, kept across calls
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
     
-    def analyze(self, text):
-        """Analyze single text"""
+    def analyze(self, text, use_cache=True):
+        """Analyze single text (use_cache is accepted for a uniform interface; nothing is cached)"""
         if not text or pd.isna(text):
             return {'label': 'neutral', 'score': 0.0, 'compound': 0.0}
         
-        scores = self.analyzer.polarity_scores(str(text))
-        compound = scores['compound']
+        return _result_from_compound(self.engine.compound(str(text)))
+    
+    def compound_scores(self, texts, workers=None):
+        """
+        Score many texts once each, returning a float64 array of compounds
+        
+        Large inputs are split across a process pool.
         
-        if compound >= 0.05:
-            label = 'positive'
-        elif compound <= -0.05:
-            label = 'negative'
-        else:
-            label = 'neutral'
+        Args:
+            texts: List of texts
+            workers: Worker processes (default from config)
+        """
+        if workers is None:
+            workers = config.SENTIMENT_WORKERS
         
-        return {
-            'label': label,
-            'score': abs(compound),
-            'compound': compound
-        }
+        return self._score_texts(list(texts), workers)
     
-    def analyze_dataframe(self, df, text_column='news_title'):
-        """Add sentiment to dataframe"""
+    def _score_texts(self, texts, workers):
+        """Run VADER over texts, in-process or across a process pool"""
+        total = len(texts)
+        
+        if workers <= 1 or total < config.SENTIMENT_PARALLEL_MIN_ROWS:
+            return _compound_chunk(texts, self.engine)
+        
+        # A few chunks per worker keeps the pool balanced
+        chunk_size = -(-total // (workers * 4))
+        chunks = [texts[i:i+chunk_size] for i in range(0, total, chunk_size)]
+        
+        logger.info(f"Scoring {total} texts across {workers} processes...")
+        
+        compound = np.empty(total, dtype=np.float64)
+        pool = self._process_pool(workers)
+        try:
+            offset = 0
+            for chunk_compound in pool.map(_compound_chunk, chunks):
+                compound[offset:offset+len(chunk_compound)] = chunk_compound
+                offset += len(chunk_compound)
+        except BrokenProcessPool:
+            # A worker died: start a fresh pool on the next call
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+        
+        return compound
+    
+    def _process_pool(self, workers):
+        """The pool of `workers` processes, started on first use and reused"""
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=True)
+                # spawn: the caller may hold torch or request threads, and
+                # forking such a process can deadlock
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+                self._pool_workers = workers
+            return self._pool
+    
+    def close(self):
+        """Stop the worker processes, if any"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+    
+    def score_batch(self, texts, workers=None, use_cache=True):
+        """Score many texts (pooled when large) into a SentimentBatch; nothing is cached"""
+        return _batch_from_compound(self.compound_scores(texts, workers=workers))
+    
+    def analyze_dataframe(self, df, text_column=None, workers=None, dedupe=None):
+        """Add sentiment to dataframe (scoring unique normalized texts once if dedupe)"""
+        if text_column is None:
+            text_column = config.SENTIMENT_TEXT_COLUMN
+        if dedupe is None:
+            dedupe = config.SENTIMENT_DEDUPE
+        
         logger.info(f"Analyzing sentiment for {len(df)} records")
         
-        sentiments = df[text_column].apply(self.analyze)
+        texts = df[text_column].tolist()
+        if dedupe:
+            uniques, codes, self.last_dedup_ratio = dedupe_texts(texts)
+            batch = self.score_batch(uniques, workers=workers).take(codes)
+        else:
+            batch = self.score_batch(texts, workers=workers)
         
-        df['sentiment_label'] = sentiments.apply(lambda x: x['label'])
-        df['sentiment_score'] = sentiments.apply(lambda x: x['score'])
-        df['sentiment_compound'] = sentiments.apply(lambda x: x['compound'])
+        batch.assign(df)
         
         logger.info(f"Sentiment distribution: {df['sentiment_label'].value_counts().to_dict()}")
-        return df
\ No newline at end of file
+        return df
+    
+    def analyze_stream(self, source, text_column=None, chunk_size=None):
+        """Score an iterable of texts or DataFrame chunks, yielding scored chunks"""
+        return iter_sentiment(self, source, text_column=text_column, chunk_size=chunk_size)
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+AsyncNewsCollector against a local stub of the NewsAPI and Finnhub endpoints
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.data_collection.async_news import AsyncNewsCollector
+
+START, END = datetime(2024, 1, 1), datetime(2024, 1, 31)
+
+def _stub_app(calls):
+    async def everything(request):
+        keyword = request.query['q']
+        calls.append(('newsapi', keyword))
+        if keyword == 'LIMITED' and calls.count(('newsapi', keyword)) == 1:
+            # Far longer than the collector is allowed to wait
+            return web.json_response({'status': 'error'}, status=429, headers={'Retry-After': '3600'})
+        if keyword == 'DOWN':
+            return web.json_response({'status': 'error'}, status=503)
+        return web.json_response({'status': 'ok', 'articles': [
+            {'title': f"{keyword} beats estimates", 'description': None, 'content': 'Body',
+             'url': 'https://example.com/a', 'source': {'name': 'Wire'}, 'publishedAt': '2024-01-02T10:00:00Z'},
+            {'title': None, 'source': None},
+            'not an article'
+        ]})
+
+    async def company_news(request):
+        symbol = request.query['symbol']
+        calls.append(('finnhub', symbol))
+        if symbol == 'HTML':
+            return web.Response(text="<html>maintenance</html>", content_type='text/html')
+        return web.json_response([
+            {'headline': f"{symbol} headline", 'summary': 'Summary', 'url': 'https://example.com/f',
+             'source': 'Feed', 'datetime': 1704189600},
+            {'headline': f"{symbol} undated", 'datetime': None},
+            None
+        ])
+
+    app = web.Application()
+    app.router.add_get('/newsapi/everything', everything)
+    app.router.add_get('/finnhub/company-news', company_news)
+    return app
+
+def _collect(symbols, collector_class=AsyncNewsCollector):
+    async def run():
+        calls = []
+        server = TestServer(_stub_app(calls))
+        await server.start_server()
+        try:
+            base = str(server.make_url('')).rstrip('/')
+            providers = {
+                name: {'base_url': f"{base}/{name}", 'rate_per_sec': 1000.0, 'burst': 100, 'concurrency': 4}
+                for name in ('newsapi', 'finnhub')
+            }
+            collector = collector_class(api_keys={'newsapi': 'key', 'finnhub': 'key'}, providers=providers,
+                                        max_retries=2, backoff=0.01, timeout=5, max_retry_after=0.05)
+            start = time.perf_counter()
+            articles = await collector.collect(symbols, START, END, keywords_per_symbol=1)
+            return articles, collector.stats(), calls, time.perf_counter() - start
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+def test_articles_from_both_providers():
+    articles, stats, _, _ = _collect(['AAA'])
+
+    newsapi = [a for a in articles if a['provider'] == 'newsapi']
+    assert [a['title'] for a in newsapi] == ["AAA beats estimates", '']
+    assert newsapi[0]['description'] == '' and newsapi[0]['source'] == 'Wire'
+    assert newsapi[1]['source'] == '' and newsapi[1]['published_at'] is None
+
+    finnhub = [a for a in articles if a['provider'] == 'finnhub']
+    assert [a['title'] for a in finnhub] == ["AAA headline", "AAA undated"]
+    assert finnhub[0]['published_at'] == '2024-01-02T10:00:00+00:00'
+    assert finnhub[1]['published_at'] is None
+
+    assert stats['newsapi']['articles'] == 2 and stats['finnhub']['articles'] == 2
+    assert stats['newsapi']['failures'] == stats['finnhub']['failures'] == 0
+
+def test_retry_after_is_capped():
+    articles, stats, calls, elapsed = _collect(['LIMITED'])
+
+    assert calls.count(('newsapi', 'LIMITED')) == 2
+    assert stats['newsapi']['retries'] == 1
+    assert any(a['title'] == "LIMITED beats estimates" for a in articles)
+    assert elapsed < 5
+
+def test_failures_do_not_stop_other_queries():
+    articles, stats, calls, _ = _collect(['DOWN', 'HTML', 'AAA'])
+
+    # 503 on every attempt: retried, then given up
+    assert calls.count(('newsapi', 'DOWN')) == 3
+    # A 200 that is not JSON is not retried
+    assert calls.count(('finnhub', 'HTML')) == 1
+    assert stats['newsapi']['failures'] == 1 and stats['finnhub']['failures'] == 1
+
+    symbols = {a['symbol'] for a in articles}
+    assert 'AAA' in symbols and 'DOWN' in symbols and 'HTML' in symbols
+
+def test_query_raising_is_isolated():
+    class Collector(AsyncNewsCollector):
+        async def _finnhub(self, session, symbol, start_date, end_date):
+            if symbol == 'BAD':
+                raise RuntimeError("parser bug")
+            return await super()._finnhub(session, symbol, start_date, end_date)
+
+    articles, stats, _, _ = _collect(['BAD', 'AAA'], collector_class=Collector)
+
+    assert stats['finnhub']['failures'] == 1
+    assert [a['title'] for a in articles if a['provider'] == 'finnhub'] == ["AAA headline", "AAA undated"]
+    assert {a['symbol'] for a in articles if a['provider'] == 'newsapi'} == {'BAD', 'AAA'}
@@ -0,0 +1,168 @@
+"""
+ModelRegistry: LRU eviction under the memory budget, deferred close of
+models in use, and one shared in-flight load per name
+"""
+import threading
+import time
+import pytest
+from src.sentiment.model_registry import ModelRegistry
+
+MB = 2 ** 20
+
+class StubAnalyzer:
+    """Stands in for HuggingFaceSentimentAnalyzer: 100MB of weights, records close()"""
+
+    worker_pool = None
+
+    def __init__(self, model_name, closed):
+        self.model_name = model_name
+        self.closed = closed
+
+    def weight_bytes(self):
+        return 100 * MB
+
+    def close(self):
+        self.closed.append(self.model_name)
+
+def _registry(budget_mb, names=('a', 'b', 'c', 'd'), factory=None):
+    closed = []
+    if factory is None:
+        factory = lambda model_name: StubAnalyzer(model_name, closed)
+    registry = ModelRegistry(models={name: name for name in names}, memory_budget_mb=budget_mb, factory=factory)
+    return registry, closed
+
+def _touch(registry, name):
+    with registry.use(name) as analyzer:
+        return analyzer
+
+def test_evicts_least_recently_used():
+    registry, closed = _registry(budget_mb=250)
+
+    _touch(registry, 'a')
+    _touch(registry, 'b')
+    _touch(registry, 'a')  # 'b' is now least recently used
+    _touch(registry, 'c')
+    assert closed == ['b']
+    assert [m['name'] for m in registry.stats()['loaded']] == ['a', 'c']
+
+    _touch(registry, 'd')
+    assert closed == ['b', 'a']
+    assert registry.stats()['evictions'] == 2 and registry.loads == 4
+
+def test_cached_analyzer_is_reused():
+    registry, _ = _registry(budget_mb=250)
+
+    assert _touch(registry, 'a') is _touch(registry, 'a')
+    assert registry.loads == 1
+    assert registry.stats()['loaded'][0]['hits'] == 2
+
+def test_unknown_name_raises_on_call():
+    registry, _ = _registry(budget_mb=250)
+
+    with pytest.raises(KeyError):
+        registry.use('missing')
+
+def test_model_in_use_is_closed_on_release():
+    registry, closed = _registry(budget_mb=150)
+
+    with registry.use('a') as analyzer:
+        _touch(registry, 'b')  # Over budget: 'a' is evicted while held
+        assert 'a' not in [m['name'] for m in registry.stats()['loaded']]
+        assert closed == []
+        assert analyzer.model_name == 'a'
+    assert closed == ['a']
+
+    # Not in use: closed as soon as it is evicted
+    _touch(registry, 'c')
+    assert closed == ['a', 'b']
+
+def test_unload_defers_close_while_in_use():
+    registry, closed = _registry(budget_mb=1000)
+
+    with registry.use('a'):
+        registry.unload('a')
+        assert closed == []
+    assert closed == ['a']
+
+def test_concurrent_requests_share_one_load():
+    closed, built = [], []
+
+    def factory(model_name):
+        built.append(model_name)
+        time.sleep(0.2)
+        return StubAnalyzer(model_name, closed)
+
+    registry, _ = _registry(budget_mb=1000, factory=factory)
+    analyzers = []
+    threads = [threading.Thread(target=lambda: analyzers.append(_touch(registry, 'a'))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert built == ['a']
+    assert len({id(analyzer) for analyzer in analyzers}) == 1 and len(analyzers) == 5
+
+def test_failed_load_reaches_waiters_and_clears_loading():
+    release = threading.Event()
+    attempts = []
+
+    def factory(model_name):
+        attempts.append(model_name)
+        release.wait(5)
+        raise RuntimeError(f"cannot load {model_name}")
+
+    registry, _ = _registry(budget_mb=1000, factory=factory)
+    errors = []
+
+    def request():
+        try:
+            _touch(registry, 'a')
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    loader = threading.Thread(target=request)
+    loader.start()
+    while 'a' not in registry._loading:
+        time.sleep(0.01)
+    waiters = [threading.Thread(target=request) for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.1)
+
+    release.set()
+    for thread in [loader] + waiters:
+        thread.join()
+
+    assert attempts == ['a']
+    assert errors == ["cannot load a"] * 4
+    assert registry._loading == {} and registry.stats()['loaded'] == []
+
+    # The next request tries again
+    with pytest.raises(RuntimeError):
+        _touch(registry, 'a')
+    assert attempts == ['a', 'a']
+
+def test_slow_load_does_not_block_loaded_models():
+    closed = []
+    release = threading.Event()
+
+    def factory(model_name):
+        if model_name == 'b':
+            release.wait(5)
+        return StubAnalyzer(model_name, closed)
+
+    registry, _ = _registry(budget_mb=1000, factory=factory)
+    _touch(registry, 'a')
+
+    loader = threading.Thread(target=_touch, args=(registry, 'b'))
+    loader.start()
+    while 'b' not in registry._loading:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    _touch(registry, 'a')
+    assert time.perf_counter() - start < 1
+
+    release.set()
+    loader.join()
@@ -0,0 +1,151 @@
+"""
+StockCollector + OHLCVStore: first fetch, incremental append, rebase after
+a corporate action, and the meta.json write, against a stubbed yfinance
+"""
+import json
+import sys
+import types
+import numpy as np
+import pandas as pd
+import pytest
+from config import config
+from src.data_collection import ohlcv_store
+from src.data_collection.ohlcv_store import OHLCVStore, period_start
+
+PERIOD = '60d'
+
+class FakeMarket:
+    """Daily bars per symbol served through yfinance's Ticker.history"""
+
+    def __init__(self):
+        self.bars = {}
+        self.calls = []
+
+    def set(self, symbol, bars):
+        self.bars[symbol] = bars
+
+    def history(self, symbol, period=None, start=None):
+        self.calls.append((symbol, {'period': period} if period else {'start': start}))
+        bars = self.bars[symbol]
+        dates = bars.index.tz_localize(None)
+        first = period_start(period) if period else pd.Timestamp(start)
+        return bars[dates >= first].copy()
+
+def _bars(dates, close, dividends=None):
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(len(close), 1_000_000.0),
+        'Dividends': dividends if dividends is not None else np.zeros(len(close)),
+        'Stock Splits': np.zeros(len(close))
+    }, index=pd.DatetimeIndex(dates, name='Date'))
+
+@pytest.fixture
+def market(monkeypatch, tmp_path):
+    market = FakeMarket()
+    yfinance = types.ModuleType('yfinance')
+    yfinance.Ticker = lambda symbol: types.SimpleNamespace(
+        history=lambda **kwargs: market.history(symbol, **kwargs)
+    )
+    monkeypatch.setitem(sys.modules, 'yfinance', yfinance)
+    monkeypatch.delitem(sys.modules, 'src.data_collection.stock_collector', raising=False)
+    monkeypatch.setattr(config, 'MARKET_DATA_DIR', tmp_path / "market_data")
+    return market
+
+@pytest.fixture
+def collector(market):
+    from src.data_collection.stock_collector import StockCollector
+    return StockCollector(fetch_mode='sequential', use_store=True)
+
+def _dates(n, end_offset=1):
+    end = pd.Timestamp.now().normalize() - pd.Timedelta(days=end_offset)
+    return pd.bdate_range(end=end, periods=n, tz='America/New_York')
+
+def test_first_fetch_fills_the_store(market, collector):
+    dates = _dates(100)
+    market.set('AAA', _bars(dates, np.linspace(100, 120, 100)))
+
+    df = collector.collect_stock_data(['AAA'], period=PERIOD)
+
+    assert market.calls == [('AAA', {'period': PERIOD})]
+    meta = collector.store.meta('AAA')
+    assert meta['covered_from'] == period_start(PERIOD)
+    assert meta['rows'] == len(df) == len(collector.store.read('AAA'))
+    assert meta['last_bar'] == dates[-1].tz_localize(None)
+    assert 'rsi' in df.columns
+
+def test_incremental_append_without_duplicates(market, collector):
+    dates = _dates(100, end_offset=3)
+    market.set('AAA', _bars(dates, np.linspace(100, 120, 100)))
+    collector.collect_stock_data(['AAA'], period=PERIOD)
+    stored = collector.store.read('AAA')
+
+    # Two new sessions; yesterday's last bar is restated (it was unfinished)
+    new_dates = dates.append(pd.bdate_range(start=dates[-1] + pd.Timedelta(days=1), periods=2, tz=dates.tz))
+    close = np.r_[np.linspace(100, 120, 100)[:-1], 121.0, 122.0, 123.0]
+    market.set('AAA', _bars(new_dates, close))
+    market.calls.clear()
+
+    collector.collect_stock_data(['AAA'], period=PERIOD)
+
+    assert market.calls == [('AAA', {'start': dates[-1].strftime('%Y-%m-%d')})]
+    updated = collector.store.read('AAA')
+    assert not updated.index.duplicated().any()
+    assert len(updated) == len(stored) + 2
+    assert updated['Close'].iloc[-3:].tolist() == [121.0, 122.0, 123.0]
+    assert collector.store.meta('AAA')['covered_from'] == period_start(PERIOD)
+
+def test_rebase_after_dividend(market, collector):
+    dates = _dates(100, end_offset=3)
+    close = np.linspace(100, 120, 100)
+    market.set('AAA', _bars(dates, close))
+    collector.collect_stock_data(['AAA'], period=PERIOD)
+
+    # A dividend in the new bar re-adjusts every earlier price
+    new_dates = dates.append(pd.bdate_range(start=dates[-1] + pd.Timedelta(days=1), periods=1, tz=dates.tz))
+    adjusted = np.r_[close * 0.98, 119.0]
+    dividends = np.zeros(101)
+    dividends[-1] = 0.5
+    market.set('AAA', _bars(new_dates, adjusted, dividends))
+    market.calls.clear()
+
+    collector.collect_stock_data(['AAA'], period=PERIOD)
+
+    covered_from = period_start(PERIOD)
+    assert market.calls == [
+        ('AAA', {'start': dates[-1].strftime('%Y-%m-%d')}),
+        ('AAA', {'start': covered_from.strftime('%Y-%m-%d')})
+    ]
+    stored = collector.store.read('AAA')
+    expected = market.bars['AAA'][new_dates.tz_localize(None) >= covered_from]
+    np.testing.assert_allclose(stored['Close'].to_numpy(), expected['Close'].to_numpy())
+    assert collector.store.meta('AAA')['covered_from'] == covered_from
+
+def test_meta_written_atomically(tmp_path, monkeypatch):
+    store = OHLCVStore(root=tmp_path)
+    dates = _dates(5)
+    store.write('AAA', _bars(dates, [1, 2, 3, 4, 5]))
+    partition = tmp_path / "symbol=AAA"
+    before = (partition / "meta.json").read_text()
+
+    replaced = []
+    real_replace = ohlcv_store.os.replace
+
+    def failing_replace(src, dst):
+        replaced.append((src.name, dst.name))
+        if dst.name == "meta.json":
+            raise OSError("disk full")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(ohlcv_store.os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        store.write('AAA', _bars(_dates(6), [1, 2, 3, 4, 5, 6]))
+
+    # meta.json goes through a temp file and is replaced last; a failed
+    # replace leaves the previous meta.json whole
+    assert replaced == [("bars.parquet.tmp", "bars.parquet"), ("meta.json.tmp", "meta.json")]
+    assert (partition / "meta.json").read_text() == before
+    assert json.loads(before)['rows'] == 5
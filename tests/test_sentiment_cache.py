@@ -0,0 +1,111 @@
+"""
+SentimentCache: hits and misses, LRU eviction, row count and access-time bookkeeping
+"""
+import itertools
+import pytest
+from src.sentiment import sentiment_cache
+from src.sentiment.sentiment_cache import SentimentCache, make_key
+
+POSITIVE = {'label': 'positive', 'score': 0.75, 'compound': 0.75}
+NEGATIVE = {'label': 'negative', 'score': 0.5, 'compound': -0.5}
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic, strictly increasing time.time() inside the cache module"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(sentiment_cache.time, 'time', lambda: float(next(ticks)))
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = SentimentCache(path=tmp_path / "sentiment.db", max_entries=10)
+    yield cache
+    cache._conn.close()
+
+def _last_access(cache, text):
+    key = make_key(text, 'hf', 'm1')
+    return cache._conn.execute("SELECT last_access FROM sentiment WHERE key = ?", (key,)).fetchone()[0]
+
+def test_hit_and_miss(cache):
+    cache.put_many(["good news", "bad news"], [POSITIVE, NEGATIVE], 'hf', 'm1')
+
+    assert cache.get_many(["bad news", "unseen", "good news"], 'hf', 'm1') == [NEGATIVE, None, POSITIVE]
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+
+def test_key_scope(cache):
+    cache.put("good  news\n", POSITIVE, 'hf', 'm1')
+
+    # Whitespace differences share a key; analyzer and model do not
+    assert cache.get("good news", 'hf', 'm1') == POSITIVE
+    assert cache.get("good news", 'hf', 'm2') is None
+    assert cache.get("good news", 'other', 'm1') is None
+
+def test_put_overwrites_without_counting_twice(cache):
+    cache.put_many(["a", "b"], [POSITIVE, POSITIVE], 'hf', 'm1')
+    cache.put_many(["b", "c"], [NEGATIVE, NEGATIVE], 'hf', 'm1')
+
+    assert cache._count == 3 and len(cache) == 3
+    assert cache.get("b", 'hf', 'm1') == NEGATIVE
+
+def test_lru_eviction_at_max_entries(cache):
+    texts = [f"text {i}" for i in range(10)]
+    for text in texts:
+        cache.put(text, POSITIVE, 'hf', 'm1')
+    assert len(cache) == 10
+
+    # Reading the oldest entries makes them recently used
+    cache.get_many(texts[:3], 'hf', 'm1')
+    cache.put("text 10", POSITIVE, 'hf', 'm1')
+
+    assert len(cache) == 10 and cache._count == 10
+    results = cache.get_many(texts + ["text 10"], 'hf', 'm1')
+    assert [text for text, r in zip(texts + ["text 10"], results) if r is None] == ["text 3"]
+
+def test_eviction_frees_slack(tmp_path, clock):
+    cache = SentimentCache(path=tmp_path / "sentiment.db", max_entries=100)
+    cache.put_many([f"text {i}" for i in range(101)], [POSITIVE] * 101, 'hf', 'm1')
+
+    # One over the limit, plus 5% of max_entries so the next insert does not evict again
+    assert len(cache) == 100 - int(100 * sentiment_cache._EVICT_SLACK)
+    assert cache._count == len(cache)
+    cache._conn.close()
+
+def test_count_starts_from_existing_rows(tmp_path, clock):
+    path = tmp_path / "sentiment.db"
+    first = SentimentCache(path=path, max_entries=10)
+    first.put_many(["a", "b", "c"], [POSITIVE] * 3, 'hf', 'm1')
+    first._conn.close()
+
+    second = SentimentCache(path=path, max_entries=10)
+    assert second._count == 3
+    second._conn.close()
+
+def test_hits_touch_in_memory_until_flushed(cache):
+    cache.put("good news", POSITIVE, 'hf', 'm1')
+    written = _last_access(cache, "good news")
+
+    cache.get("good news", 'hf', 'm1')
+    assert make_key("good news", 'hf', 'm1') in cache._touched
+    assert _last_access(cache, "good news") == written
+
+    cache.flush()
+    assert cache._touched == {}
+    assert _last_access(cache, "good news") > written
+
+def test_touches_written_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(sentiment_cache, '_TOUCH_BATCH', 2)
+    cache.put_many(["a", "b"], [POSITIVE, POSITIVE], 'hf', 'm1')
+    written = _last_access(cache, "a")
+
+    cache.get("a", 'hf', 'm1')
+    assert len(cache._touched) == 1
+    cache.get("b", 'hf', 'm1')
+    assert cache._touched == {}
+    assert _last_access(cache, "a") > written and _last_access(cache, "b") > written
+
+def test_clear(cache):
+    cache.put("good news", POSITIVE, 'hf', 'm1')
+    cache.get("good news", 'hf', 'm1')
+    cache.clear()
+
+    assert len(cache) == 0 and cache._count == 0 and cache._touched == {}
+    assert cache.stats()['hits'] == 0 and cache.stats()['misses'] == 0
@@ -0,0 +1,79 @@
+"""
+StreamingIndicators must replay to the batch indicator columns and carry
+on unchanged across save() / load()
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from config import config
+from src.data_collection.indicators import add_indicators
+from src.data_collection.streaming_indicators import StreamingIndicators
+
+def _bars(n_symbols=4, n_bars=120, seed=0):
+    """Random-walk daily bars with flat stretches and one-sided runs"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_symbols):
+        changes = rng.normal(0, 1, n_bars).round(2)
+        changes[20:40] = 0.0  # Flat: RSI undefined
+        changes[50:70] = np.abs(changes[50:70]) + 0.01  # Only gains: RSI 100
+        close = 100 + i * 10 + np.cumsum(changes)
+        frames.append(pd.DataFrame({
+            'symbol': f"S{i}",
+            'date': pd.date_range('2024-01-01', periods=n_bars, freq='D'),
+            'Open': close,
+            'High': close + 1,
+            'Low': close - 1,
+            'Close': close,
+            'Volume': rng.integers(1_000, 100_000, n_bars).astype(float)
+        }))
+    # Interleave symbols so replay has to regroup them
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+def _assert_same(actual, expected):
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual[~np.isnan(actual)], expected[~np.isnan(expected)], rtol=1e-9, atol=1e-9)
+
+def test_replay_matches_batch_columns():
+    df = _bars()
+    batch = add_indicators(df).sort_values(['symbol', 'date'], kind='stable')
+    streamed = StreamingIndicators().replay(df)
+
+    assert streamed.index.equals(batch.index)
+    _assert_same(streamed['rsi'], batch['rsi'])
+    _assert_same(streamed['volume_ma'], batch[f'volume_ma_{config.VOLUME_MA_WINDOW}'])
+
+    ema = batch.groupby('symbol')['Close'].transform(lambda s: s.ewm(span=config.STREAM_EMA_SPAN, adjust=False).mean())
+    _assert_same(streamed['ema'], ema)
+
+def test_replay_matches_pandas_rsi():
+    df = _bars(n_symbols=1, seed=1)
+    streamed = StreamingIndicators().replay(df)
+
+    delta = streamed['Close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(window=config.RSI_PERIOD).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=config.RSI_PERIOD).mean()
+    _assert_same(streamed['rsi'], 100 - 100 / (1 + gain / loss))
+
+@pytest.mark.parametrize('smoothing', ['sma', 'wilder'])
+def test_save_load_continue(tmp_path, smoothing):
+    df = _bars(seed=2).sort_values(['symbol', 'date'], kind='stable')
+    cut = df['date'].sort_values().iloc[len(df) // 2]
+    head, tail = df[df['date'] <= cut], df[df['date'] > cut]
+
+    expected = StreamingIndicators(rsi_smoothing=smoothing).replay(df)
+
+    first = StreamingIndicators(rsi_smoothing=smoothing)
+    first.replay(head)
+    path = first.save(tmp_path / "state.json")
+
+    restored = StreamingIndicators.load(path, rsi_smoothing=smoothing)
+    assert restored.to_dict() == first.to_dict()
+
+    continued = restored.replay(tail)
+    for column in ('rsi', 'ema', 'volume_ma'):
+        _assert_same(continued[column], expected.loc[continued.index, column])
+
+def test_load_without_state_file(tmp_path):
+    assert StreamingIndicators.load(tmp_path / "missing.json").symbols == {}
@@ -0,0 +1,105 @@
+"""
+BatchVADEREngine must score exactly like SentimentIntensityAnalyzer
+"""
+import random
+import pytest
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from src.sentiment.vader_analyzer import BatchVADEREngine, VADERSentimentAnalyzer
+
+CORPUS = [
+    # Plain polarity
+    "Shares rise after strong earnings",
+    "The company reported a terrible loss",
+    "Market uncertainty leads to cautious trading.",
+    # Negations
+    "The outlook is not good",
+    "Revenue isn't bad at all",
+    "Investors aren't happy, never happy",
+    "No growth, no profit",
+    "Not only no profit but no hope",
+    "There is no or nor good news",
+    "It was never so good",
+    "Never this bad before",
+    "Without doubt a great quarter",
+    "without any doubt a great quarter",
+    "least good result",
+    "at least good result",
+    "very least good result",
+    # Caps emphasis and boosters
+    "The results were GREAT",
+    "The results were GREAT and the outlook is GOOD",
+    "EVERYTHING IS TERRIBLE",
+    "Extremely good, very good, somewhat good",
+    "The quarter was kind of good",
+    "It was sort of bad, barely acceptable",
+    "EXTREMELY bad guidance from a VERY weak team",
+    # But
+    "The earnings were good but the guidance was terrible",
+    "Good good good but bad bad",
+    "Bad but good but great",
+    "but nothing else",
+    # Idioms
+    "The stock is the bomb",
+    "That was a hard pressed quarter, yeah right",
+    "They cut the mustard this time",
+    "Head case management, kiss of death for shareholders",
+    # Punctuation emphasis
+    "Great results!",
+    "Great results!!!!!!",
+    "Terrible results!!",
+    "Is this good??",
+    "Is this good????",
+    "Good?!?!",
+    "Neutral statement!!!",
+    # Emoji and emoticons
+    "Stocks are up 🚀🚀",
+    "Earnings miss 😢",
+    "Great day 😀 for investors",
+    "😡😡😡",
+    "Mixed feelings :) :(",
+    "Not happy :-(",
+    # Edge cases
+    "",
+    "   ",
+    "!!!",
+    "a",
+    "the of and",
+]
+
+WORDS = (
+    "good bad great terrible not no never very extremely kind of least at without doubt "
+    "but so this happy sad GOOD BAD GREAT profit loss rise fall ! ? :) 😀 😢 isn't can't"
+).split()
+
+def _generated(count, seed=0):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 14))) for _ in range(count)]
+
+@pytest.fixture(scope='module')
+def reference():
+    return SentimentIntensityAnalyzer()
+
+@pytest.fixture(scope='module')
+def engine(reference):
+    return BatchVADEREngine(reference)
+
+@pytest.mark.parametrize('text', CORPUS)
+def test_compound_matches_polarity_scores(engine, reference, text):
+    assert engine.compound(text) == reference.polarity_scores(text)['compound']
+
+def test_generated_texts_match(engine, reference):
+    texts = _generated(2000)
+    mismatches = [t for t in texts if engine.compound(t) != reference.polarity_scores(t)['compound']]
+    assert mismatches == []
+
+def test_compound_batch_matches_single_calls(engine, reference):
+    texts = CORPUS + [None, float('nan')]
+    compound = engine.compound_batch(texts)
+    expected = [reference.polarity_scores(t)['compound'] if isinstance(t, str) and t else 0.0 for t in texts]
+    assert compound.tolist() == expected
+
+def test_analyzer_labels_follow_compound(reference):
+    analyzer = VADERSentimentAnalyzer()
+    batch = analyzer.score_batch(CORPUS, workers=1)
+    for text, label in zip(CORPUS, batch.labels):
+        assert analyzer.analyze(text)['label'] == label